@@ -1,23 +1,15 @@
-from bs4 import BeautifulSoup
+from lxml import html
 
 # Path to your HTML file
 html_file = "B_O Trading Blog _ Substack.htm"
 
-# Read the file
-with open(html_file, "r", encoding="utf-8") as file:
-    soup = BeautifulSoup(file, "lxml")
-
-# Extract all links
-links = []
-for a in soup.find_all("a", href=True):
-    url = a["href"]
-    if "substack.com/p/" in url:  # Filter only blog post URLs
-        links.append(url)
+# Parse the file and extract blog post URLs in one XPath query
+doc = html.parse(html_file, parser=html.HTMLParser(encoding="utf-8"))
+links = doc.xpath('//a[contains(@href, "substack.com/p/")]/@href')  # Filter only blog post URLs
 
 # Save extracted URLs to a text file
 output_file = "blog_urls.txt"
-with open(output_file, "w") as f:
-    f.write("\n".join(links))
+with open(output_file, "wb", buffering=1 << 20) as f:
+    f.writelines(f"{link}\n".encode("utf-8") for link in links)
 
 print(f"Extracted {len(links)} blog post URLs. Saved to {output_file}")
-
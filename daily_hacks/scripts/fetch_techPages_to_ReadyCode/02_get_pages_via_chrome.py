@@ -2,11 +2,23 @@
 import time 
 import os 
 import sys
+import json
+import asyncio
+import queue
+import threading
+from http.cookies import SimpleCookie
+from concurrent.futures import ThreadPoolExecutor
 
+import aiohttp
+import aiofiles
+from yarl import URL
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 
 
 
@@ -60,9 +72,9 @@ driver_path = "/Users/kbillis/miniconda3/envs/BO_channel_detection1/lib/python3.
 # service = Service(driver_path)
 # driver = webdriver.Chrome(service=service, options=chrome_options)
 
-# Use WebDriver Manager to install the correct ChromeDriver version
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service)
+# Use WebDriver Manager to install the correct ChromeDriver version (once; workers reuse the path)
+chromedriver_path = ChromeDriverManager().install()
+driver = webdriver.Chrome(service=Service(chromedriver_path))
 
 
 # Log in manually first
@@ -70,26 +82,193 @@ print("Open Chrome and log in to Substack. Then press Enter...")
 driver.get("https://substack.com")
 input("Press Enter after logging in...")
 
-# Download each blog as PDF and save full HTML
-for url in urls:
-    print(f"Processing: {url}")
-    driver.get(url)
-    time.sleep(5)  # Wait for page to load
-
-    # Extract full HTML and save
-    html_content = driver.page_source
+def html_path_for(url):
+    """Return the local HTML path for a blog post URL."""
     filename_base = url.split("/")[-1] or "index"  # Use last part of URL for filename
-    html_filename = os.path.join(download_dir, f"{filename_base}.html")
+    return os.path.join(download_dir, f"{filename_base}.html")
+
+
+# Manifest of already-fetched URLs, used to skip pages on re-runs
+manifest_path = os.path.join(download_dir, "manifest.json")
+cache_ttl = 7 * 24 * 3600  # Revalidate cached pages older than a week
+
+
+def load_manifest():
+    """Load the URL manifest, or start an empty one."""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest():
+    """Write the URL manifest atomically so a crash never leaves it half-written."""
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def is_cached(url):
+    """Return True if the page is already on disk and still fresh."""
+    html_filename = html_path_for(url)
+    if not (os.path.exists(html_filename) and os.path.getsize(html_filename) > 0):
+        return False
+    entry = manifest.get(url)
+    # Pages saved before the manifest existed are trusted as-is
+    return entry is None or time.time() - entry["ts"] < cache_ttl
 
-    with open(html_filename, "w", encoding="utf-8") as file:
-        file.write(html_content)
-    
+
+def conditional_headers(url):
+    """Build revalidation headers from a stale manifest entry."""
+    entry = manifest.get(url)
+    headers = {}
+    if entry and os.path.exists(html_path_for(url)):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+manifest = load_manifest()
+
+
+def cookie_jar_from_driver(driver):
+    """Copy the logged-in Selenium session cookies into an aiohttp cookie jar."""
+    jar = aiohttp.CookieJar()
+    for cookie in driver.get_cookies():
+        # Keep each cookie's scope so the session only goes back to the site that set it
+        domain = cookie["domain"]
+        morsel = SimpleCookie()
+        morsel[cookie["name"]] = cookie["value"]
+        if domain.startswith("."):
+            # Domain cookie; host-only cookies take their host from response_url
+            morsel[cookie["name"]]["domain"] = domain
+        morsel[cookie["name"]]["path"] = cookie.get("path", "/")
+        if cookie.get("secure"):
+            morsel[cookie["name"]]["secure"] = True
+        jar.update_cookies(morsel, response_url=URL(f"https://{domain.lstrip('.')}"))
+    return jar
+
+
+async def fetch(session, url, sem):
+    """Fetch one page over plain HTTP and save it. Returns True on success."""
+    async with sem:
+        try:
+            async with session.get(url, headers=conditional_headers(url)) as response:
+                if response.status == 304:
+                    manifest[url]["ts"] = time.time()
+                    print(f"Not modified: {url}")
+                    return True
+                if response.status != 200:
+                    print(f"HTTP {response.status} for {url}, will retry with Chrome")
+                    return False
+                html_content = await response.text()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"HTTP fetch failed for {url}: {e}, will retry with Chrome")
+            return False
+
+    html_filename = html_path_for(url)
+    async with aiofiles.open(html_filename, "w", encoding="utf-8") as file:
+        await file.write(html_content)
+    manifest[url] = {"ts": time.time(), "etag": etag, "last_modified": last_modified}
     print(f"Saved HTML: {html_filename}")
+    return True
 
-    # Print page as PDF
-    # driver.execute_script("window.print();")
-    time.sleep(3)  # Allow time for saving
 
-print("All blogs downloaded as PDFs and HTML files!")
-driver.quit()
+async def fetch_all(urls, cookie_jar, concurrency=16):
+    """Fetch all URLs concurrently, returning the ones that need Chrome."""
+    sem = asyncio.Semaphore(concurrency)
+    timeout = aiohttp.ClientTimeout(total=60)
+    headers = {"User-Agent": driver.execute_script("return navigator.userAgent;")}
+    async with aiohttp.ClientSession(cookie_jar=cookie_jar, timeout=timeout, headers=headers) as session:
+        results = await asyncio.gather(*(fetch(session, url, sem) for url in urls))
+    return [url for url, ok in zip(urls, results) if not ok]
 
+
+# Skip pages already downloaded on a previous run
+pending_urls = [url for url in urls if not is_cached(url)]
+print(f"Skipping {len(urls) - len(pending_urls)} already downloaded pages")
+
+# Download each blog over HTTP using the logged-in session cookies
+print(f"Fetching {len(pending_urls)} pages over HTTP...")
+chrome_urls = asyncio.run(fetch_all(pending_urls, cookie_jar_from_driver(driver))) if pending_urls else []
+save_manifest()
+
+def make_driver(cookies):
+    """Start a headless Chrome worker that shares the logged-in session."""
+    # Each worker gets its own Service, so quitting it only stops its own chromedriver
+    worker = webdriver.Chrome(service=Service(chromedriver_path), options=chrome_options)
+    worker.get("https://substack.com")
+    for cookie in cookies:
+        try:
+            worker.add_cookie(cookie)
+        except Exception as e:
+            print(f"Could not copy cookie {cookie.get('name')}: {e}")
+    return worker
+
+
+print_lock = threading.Lock()
+
+
+def page_html(worker):
+    """Serialize the rendered DOM through the DevTools protocol instead of page_source."""
+    root = worker.execute_cdp_cmd("DOM.getDocument", {"depth": 0})["root"]["nodeId"]
+    return worker.execute_cdp_cmd("DOM.getOuterHTML", {"nodeId": root})["outerHTML"]
+
+
+def render_with_chrome(url):
+    """Render one page in a pooled Chrome driver and save its HTML. Returns an error or None."""
+    worker = driver_pool.get()
+    try:
+        with print_lock:
+            print(f"Processing with Chrome: {url}")
+        worker.get(url)
+        # Proceed as soon as the post body is in the DOM rather than sleeping
+        try:
+            WebDriverWait(worker, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "article, div.post-content")))
+        except TimeoutException:
+            return "timed out waiting for the article body"
+
+        # Extract full HTML and save
+        html_content = page_html(worker)
+        html_filename = html_path_for(url)
+
+        with open(html_filename, "w", encoding="utf-8") as file:
+            file.write(html_content)
+
+        with print_lock:
+            manifest[url] = {"ts": time.time(), "etag": None, "last_modified": None}
+            print(f"Saved HTML: {html_filename}")
+        return None
+    except Exception as e:
+        return e
+    finally:
+        driver_pool.put(worker)
+
+
+# Fall back to a pool of persistent Chrome workers for pages that could not be fetched directly
+if chrome_urls:
+    num_workers = min(6, len(chrome_urls))
+    session_cookies = driver.get_cookies()
+    driver_pool = queue.Queue()
+    for _ in range(num_workers):
+        driver_pool.put(make_driver(session_cookies))
+
+    try:
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            for url, error in zip(chrome_urls, executor.map(render_with_chrome, chrome_urls)):
+                if error:
+                    print(f"Failed to render {url}: {error}")
+    finally:
+        while not driver_pool.empty():
+            driver_pool.get().quit()
+        save_manifest()
+
+print("All blogs downloaded as HTML files!")
+driver.quit()
@@ -1,27 +1,22 @@
 import re
 import os
 import glob
+import mmap
+from concurrent.futures import ProcessPoolExecutor
 
-def clean_drive_link(link):
-    """Clean a Google Drive link by removing trailing backslashes and other unwanted characters."""
-    # Remove trailing backslashes
-    cleaned_link = re.sub(r'\\+$', '', link)
-    return cleaned_link
+# Pattern specifically for Google Drive file links. Trailing backslashes
+# (from escaped JSON in saved pages) are not part of the match.
+DRIVE_RE = re.compile(rb'https://drive\.google\.com/file/d/[a-zA-Z0-9_-]+/view\?usp=sharing')
 
 def extract_drive_links(file_path):
     """Extract Google Drive links from a file."""
     try:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as file:
-            content = file.read()
-            
-        # Pattern specifically for Google Drive file links
-        drive_pattern = r'https://drive\.google\.com/file/d/[a-zA-Z0-9_-]+/view\?usp=sharing\\*'
-        drive_links = re.findall(drive_pattern, content)
-        
-        # Clean the links
-        cleaned_links = [clean_drive_link(link) for link in drive_links]
-        
-        return cleaned_links
+        if os.path.getsize(file_path) == 0:
+            return []
+        # Scan the raw bytes through mmap, without decoding the whole file
+        with open(file_path, "rb") as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [m.group(0).decode("ascii") for m in DRIVE_RE.finditer(mm)]
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
         return []
@@ -32,29 +27,22 @@ def main():
     file_dir = "./2nd_attempt/"  
     
     # Get all files in the directory (or specify a pattern like "*.txt" or "*.html")
-    files = glob.glob(os.path.join(file_dir, "*"))
+    files = [f for f in glob.glob(os.path.join(file_dir, "*")) if os.path.isfile(f)]
     
     if not files:
         print("No files found in the specified directory.")
         return
     
-    all_links = []
+    # Unique links in first-seen order (dict keys keep insertion order)
+    unique_links = {}
     
-    # Process each file
-    for file_path in files:
-        if os.path.isfile(file_path):
-            print(f"Processing {file_path}...")
-            links = extract_drive_links(file_path)
-            
+    # Process files in parallel; map() keeps results in file order
+    print(f"Processing {len(files)} files...")
+    with ProcessPoolExecutor() as executor:
+        for file_path, links in zip(files, executor.map(extract_drive_links, files, chunksize=8)):
             if links:
                 print(f"Found {len(links)} Google Drive links in {file_path}")
-                all_links.extend(links)
-    
-    # Remove duplicates while preserving order
-    unique_links = []
-    for link in all_links:
-        if link not in unique_links:
-            unique_links.append(link)
+                unique_links.update(dict.fromkeys(links))
     
     # Print all unique links
     print("\n=== All Unique Google Drive Links ===")
@@ -62,8 +50,8 @@ def main():
         print(link)
     
     # Save links to a file
-    with open("google_drive_links.txt", "w", encoding="utf-8") as output_file:
-        output_file.write("\n".join(unique_links))
+    with open("google_drive_links.txt", "wb", buffering=1 << 20) as output_file:
+        output_file.writelines(f"{link}\n".encode("ascii") for link in unique_links)
     
     print(f"\nExtracted {len(unique_links)} unique Google Drive links")
     print("Links have been saved to google_drive_links.txt")
@@ -1,8 +1,20 @@
 import os
 import re
+import time
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import shutil
+import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
+# Pattern to extract the file ID from Google Drive links
+FILE_ID_RE = re.compile(r'https://drive\.google\.com/file/d/([a-zA-Z0-9_-]+)/view')
+
+# Shared HTTP session so fallback downloads reuse keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
 def install_gdown_if_needed():
     """Check if gdown is installed and install if needed."""
     try:
@@ -15,175 +27,258 @@ def install_gdown_if_needed():
 
 def extract_file_id(drive_link):
     """Extract file ID from a Google Drive link."""
-    # Pattern to extract the file ID from Google Drive links
-    pattern = r'https://drive\.google\.com/file/d/([a-zA-Z0-9_-]+)/view'
-    match = re.search(pattern, drive_link)
+    match = FILE_ID_RE.search(drive_link)
     if match:
         return match.group(1)
     return None
 
-def download_drive_files(links_file, output_folder="downloaded_files", failed_links_file="failed_links.txt"):
+# Leading bytes of the file types we commonly get from Drive
+HEADER_EXTENSIONS = {
+    b'PK\x03\x04': '.zip',
+    b'%PDF': '.pdf',
+    b'\xff\xd8\xff': '.jpg',
+    b'\x89PNG': '.png',
+}
+
+# Signature lengths to try, longest first, so a lookup is one dict hit per length
+SIGNATURE_LENGTHS = sorted({len(signature) for signature in HEADER_EXTENSIONS}, reverse=True)
+
+# Extensions for the MIME types libmagic reports for those files
+MIME_EXTENSIONS = {
+    'application/zip': '.zip',
+    'application/x-zip-compressed': '.zip',
+    'application/pdf': '.pdf',
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': '.xlsx'
+}
+
+def extension_from_header(head):
+    """Return the file extension for a known header prefix, or '' if unknown."""
+    for length in SIGNATURE_LENGTHS:
+        extension = HEADER_EXTENSIONS.get(head[:length])
+        if extension:
+            return extension
+    return ""
+
+def _rename_with_extension(output_path, extension):
+    """Append extension to the downloaded file, if there is one. Returns the final path."""
+    if not extension:
+        return output_path
+    new_path = f"{output_path}{extension}"
+    os.replace(output_path, new_path)
+    print(f"Renamed file with extension: {os.path.basename(new_path)}")
+    return new_path
+
+def _finalize_with_magic(output_path):
+    """Name a downloaded file after the MIME type libmagic detects."""
+    file_type = magic.from_file(output_path, mime=True)
+    return _rename_with_extension(output_path, MIME_EXTENSIONS.get(file_type, ""))
+
+def _finalize_with_headers(output_path):
+    """Name a downloaded file after its leading signature bytes."""
+    with open(output_path, 'rb') as f:
+        head = f.read(8)
+    return _rename_with_extension(output_path, extension_from_header(head))
+
+# Pick the file-type detector once at import instead of on every download
+try:
+    import magic  # python-magic library for file type detection
+    FINALIZE = _finalize_with_magic
+except ImportError:
+    FINALIZE = _finalize_with_headers
+
+def download_with_requests(file_id, output_path, chunk_size=1 << 20):
+    """
+    Stream a Drive file with the shared session.
+    The type is sniffed from the first chunk so the file is written straight
+    to its final name. Returns that path, or None if the download was empty.
+    """
+    url = f"https://drive.google.com/uc?id={file_id}"
+    with SESSION.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        chunks = response.iter_content(chunk_size=chunk_size)
+        head = next(chunks, b"")
+        if not head:
+            return None
+        final_path = output_path + extension_from_header(head[:8])
+        # Stream into a .part file and rename it only once complete, so a
+        # dropped connection never leaves a partial file under the real name
+        part_path = final_path + ".part"
+        try:
+            with open(part_path, "wb", buffering=chunk_size) as f:
+                f.write(head)
+                for chunk in chunks:
+                    f.write(chunk)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+    os.replace(part_path, final_path)
+    return final_path
+
+def iter_links(links_file):
+    """Yield the non-empty, stripped lines of links_file one at a time."""
+    with open(links_file, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield line
+
+def list_existing_downloads(output_folder):
+    """Map file ID -> path for every non-empty file already in output_folder."""
+    existing = {}
+    with os.scandir(output_folder) as entries:
+        for entry in entries:
+            # .part files are unfinished downloads, not files to skip
+            if entry.is_file() and not entry.name.endswith(".part") and entry.stat().st_size > 0:
+                existing[entry.name.split('.')[0]] = entry.path
+    return existing
+
+def fetch_one(link, output_folder, existing, max_retries=4):
+    """
+    Download a single Google Drive link into output_folder.
+    existing is the listing from list_existing_downloads, used to skip
+    files downloaded on a previous run (with any extension).
+    Returns a (status, link, message) tuple where status is one of
+    'ok', 'skipped', 'INVALID_ID', 'DOWNLOAD_FAILED' or 'ERROR'.
+    """
+    import gdown
+    
+    file_id = extract_file_id(link)
+    if not file_id:
+        return "INVALID_ID", link, f"Could not extract file ID from: {link}"
+    
+    # Check if file already exists with any extension
+    if file_id in existing:
+        return "skipped", link, f"Skipping {file_id} - already downloaded as {os.path.basename(existing[file_id])}"
+    
+    base_output_path = os.path.join(output_folder, file_id)
+        
+    try:
+        # Create a clean output path using just the file ID
+        output_path = base_output_path
+        
+        # First try with gdown, backing off when Drive rate-limits us
+        success = False
+        url = f"https://drive.google.com/uc?id={file_id}"
+        
+        for attempt in range(max_retries):
+            try:
+                downloaded_path = gdown.download(url, output_path, quiet=True)
+                if downloaded_path and os.path.exists(downloaded_path) and os.path.getsize(downloaded_path) > 0:
+                    success = True
+                else:
+                    print(f"gdown download failed or produced empty file for {file_id}")
+                break
+            except Exception as e:
+                if "429" in str(e) and attempt < max_retries - 1:
+                    delay = 2 ** attempt
+                    print(f"Rate limited on {file_id}, retrying in {delay}s")
+                    time.sleep(delay)
+                    continue
+                print(f"gdown failed for {file_id}: {str(e)}")
+                break
+        
+        # If gdown fails, fall back to a plain streamed HTTP download
+        already_typed = False
+        if not success:
+            try:
+                print(f"Trying direct HTTP download for {file_id}")
+                downloaded_path = download_with_requests(file_id, output_path)
+                if downloaded_path:
+                    success = True
+                    # The streamed download already picked the extension if it knew the type
+                    already_typed = downloaded_path != output_path
+                    output_path = downloaded_path
+                    print(f"Successfully downloaded over HTTP: {output_path}")
+                else:
+                    print(f"HTTP download produced empty file for {file_id}")
+            except requests.RequestException as e:
+                print(f"HTTP download failed for {file_id}: {str(e)}")
+        
+        # Check file type and rename if needed
+        if success and not already_typed:
+            output_path = FINALIZE(output_path)
+        
+        if success:
+            return "ok", link, f"Downloaded {os.path.basename(output_path)}"
+        return "DOWNLOAD_FAILED", link, f"Failed to download: {link}"
+            
+    except Exception as e:
+        return "ERROR", link, str(e)
+
+
+def download_drive_files(links_file, output_folder="downloaded_files", failed_links_file="failed_links.txt", max_workers=16):
     """
     Download all Google Drive files from the links in the specified file.
     Skips files that have already been downloaded.
     Records failed links in a separate file.
     Handles specific issues with Google Drive downloads.
+    Downloads run concurrently on a thread pool since each one is I/O-bound.
     """
-    # Import required libraries
-    import gdown
-    import subprocess
-    import shutil
-    
     # Create output folder if it doesn't exist
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
         print(f"Created output folder: {output_folder}")
     
-    # Read links from file
-    with open(links_file, "r", encoding="utf-8") as file:
-        links = file.read().splitlines()
-    
-    print(f"Found {len(links)} links to process")
-    
     # Track statistics
     successful_downloads = 0
     failed_downloads = 0
     skipped_downloads = 0
-    failed_links = []  # List to store failed links
     
-    for link in tqdm(links, desc="Processing files"):
-        if not link.strip():  # Skip empty lines
-            continue
-            
-        file_id = extract_file_id(link)
-        if not file_id:
-            print(f"Could not extract file ID from: {link}")
-            failed_downloads += 1
-            failed_links.append(f"INVALID_ID: {link}")
-            continue
-        
-        # Create paths for potential existing files
-        base_output_path = os.path.join(output_folder, file_id)
-        possible_paths = [
-            base_output_path,
-            f"{base_output_path}.zip",
-            f"{base_output_path}.pdf",
-            f"{base_output_path}.jpg",
-            f"{base_output_path}.png",
-            f"{base_output_path}.docx",
-            f"{base_output_path}.xlsx"
-        ]
-        
-        # Check if file already exists with any common extension
-        file_exists = False
-        existing_path = None
-        
-        for path in possible_paths:
-            if os.path.exists(path) and os.path.getsize(path) > 0:
-                file_exists = True
-                existing_path = path
-                break
-        
-        if file_exists:
-            print(f"Skipping {file_id} - already downloaded as {os.path.basename(existing_path)}")
-            skipped_downloads += 1
-            continue
-            
-        try:
-            # Create a clean output path using just the file ID
-            output_path = base_output_path
-            
-            # First try with gdown
-            success = False
-            url = f"https://drive.google.com/uc?id={file_id}"
+    # List the output folder once instead of probing each file
+    existing = list_existing_downloads(output_folder)
+    
+    # Failed links are written as they happen, one line at a time, so they
+    # survive a crash. The file is only opened on the first failure, so a
+    # clean run keeps the previous list. Only this thread writes to it.
+    failed_file = None
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Downloads start while the links file is still being read. Each
+            # file ID is submitted once, so two workers never write the same file
+            futures = []
+            submitted_ids = set()
+            for link in iter_links(links_file):
+                file_id = extract_file_id(link)
+                if file_id and file_id in submitted_ids:
+                    print(f"Skipping {file_id} - listed more than once")
+                    skipped_downloads += 1
+                    continue
+                submitted_ids.add(file_id)
+                futures.append(executor.submit(fetch_one, link, output_folder, existing))
+            total_links = len(futures) + skipped_downloads
+            print(f"Found {total_links} links to process")
             
-            try:
-                downloaded_path = gdown.download(url, output_path, quiet=False)
-                if downloaded_path and os.path.exists(downloaded_path) and os.path.getsize(downloaded_path) > 0:
-                    success = True
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Processing files"):
+                status, link, message = future.result()
+                print(message)
+                if status == "ok":
+                    successful_downloads += 1
+                elif status == "skipped":
+                    skipped_downloads += 1
                 else:
-                    print(f"gdown download failed or produced empty file for {file_id}")
-            except Exception as e:
-                print(f"gdown failed for {file_id}: {str(e)}")
-            
-            # If gdown fails, try wget as a fallback
-            if not success:
-                try:
-                    print(f"Trying wget for {file_id}")
-                    # Use wget to download the file
-                    wget_command = f"wget -q -O {output_path} 'https://drive.google.com/uc?id={file_id}'"
-                    result = subprocess.run(wget_command, shell=True, check=True)
-                    
-                    # Check if file was downloaded and is not empty
-                    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                        success = True
-                        print(f"Successfully downloaded with wget: {output_path}")
+                    failed_downloads += 1
+                    if failed_file is None:
+                        failed_file = open(failed_links_file, "w", encoding="utf-8", buffering=1)
+                        failed_file.write("# Failed downloads\n")
+                        failed_file.write("# Format: [ERROR_TYPE]: [LINK] - [ERROR_MESSAGE]\n\n")
+                    if status == "ERROR":
+                        failed_file.write(f"ERROR: {link} - {message}\n")
                     else:
-                        print(f"wget download failed or produced empty file for {file_id}")
-                except subprocess.CalledProcessError as e:
-                    print(f"wget failed for {file_id}: {str(e)}")
-            
-            # Check file type and rename if needed
-            if success:
-                try:
-                    import magic  # python-magic library for file type detection
-                    file_type = magic.from_file(output_path, mime=True)
-                    
-                    # Add appropriate extension based on MIME type
-                    extension_map = {
-                        'application/zip': '.zip',
-                        'application/x-zip-compressed': '.zip',
-                        'application/pdf': '.pdf',
-                        'image/jpeg': '.jpg',
-                        'image/png': '.png',
-                        'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx',
-                        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': '.xlsx'
-                    }
-                    
-                    if file_type in extension_map:
-                        new_path = f"{output_path}{extension_map[file_type]}"
-                        shutil.move(output_path, new_path)
-                        print(f"Renamed file with extension: {os.path.basename(new_path)}")
-                        output_path = new_path
-                except ImportError:
-                    # If magic is not available, check file headers manually for common formats
-                    with open(output_path, 'rb') as f:
-                        header = f.read(8)
-                        if header.startswith(b'PK\x03\x04'):  # ZIP file signature
-                            new_path = f"{output_path}.zip"
-                            shutil.move(output_path, new_path)
-                            print(f"Renamed zip file: {os.path.basename(new_path)}")
-                            output_path = new_path
-                        elif header.startswith(b'%PDF'):  # PDF file signature
-                            new_path = f"{output_path}.pdf"
-                            shutil.move(output_path, new_path)
-                            print(f"Renamed PDF file: {os.path.basename(new_path)}")
-                            output_path = new_path
-                        # Add more file header checks here if needed
-            
-            if success:
-                successful_downloads += 1
-            else:
-                failed_downloads += 1
-                failed_links.append(f"DOWNLOAD_FAILED: {link}")
-                print(f"Failed to download: {link}")
-                
-        except Exception as e:
-            failed_downloads += 1
-            failed_links.append(f"ERROR: {link} - {str(e)}")
-            print(f"Error downloading {link}: {str(e)}")
+                        failed_file.write(f"{status}: {link}\n")
+    finally:
+        if failed_file is not None:
+            failed_file.close()
     
-    # Save failed links to file
-    if failed_links:
-        with open(failed_links_file, "w", encoding="utf-8") as f:
-            f.write("# Failed downloads\n")
-            f.write("# Format: [ERROR_TYPE]: [LINK] - [ERROR_MESSAGE]\n\n")
-            f.write("\n".join(failed_links))
-        print(f"Saved {len(failed_links)} failed links to {failed_links_file}")
+    if failed_downloads:
+        print(f"Saved {failed_downloads} failed links to {failed_links_file}")
     
     # Print summary
     print(f"\nDownload summary:")
-    print(f"  - Total links: {len(links)}")
+    print(f"  - Total links: {total_links}")
     print(f"  - Successfully downloaded: {successful_downloads}")
     print(f"  - Skipped (already downloaded): {skipped_downloads}")  
     print(f"  - Failed: {failed_downloads}")
@@ -199,8 +294,6 @@ def download_drive_files_02(links_file, output_folder="downloaded_files", failed
     """
     # Import required libraries
     import gdown
-    import subprocess
-    import shutil
     
     # Create output folder if it doesn't exist
     if not os.path.exists(output_folder):
@@ -244,25 +337,25 @@ def download_drive_files_02(links_file, output_folder="downloaded_files", failed
             except Exception as e:
                 print(f"gdown failed for {file_id}: {str(e)}")
             
-            # If gdown fails, try wget as a fallback
+            # If gdown fails, fall back to a plain streamed HTTP download
+            already_typed = False
             if not success:
                 try:
-                    print(f"Trying wget for {file_id}")
-                    # Use wget to download the file
-                    wget_command = f"wget -q -O {output_path} 'https://drive.google.com/uc?id={file_id}'"
-                    result = subprocess.run(wget_command, shell=True, check=True)
-                    
-                    # Check if file was downloaded and is not empty
-                    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                    print(f"Trying direct HTTP download for {file_id}")
+                    downloaded_path = download_with_requests(file_id, output_path)
+                    if downloaded_path:
                         success = True
-                        print(f"Successfully downloaded with wget: {output_path}")
+                        # The streamed download already picked the extension if it knew the type
+                        already_typed = downloaded_path != output_path
+                        output_path = downloaded_path
+                        print(f"Successfully downloaded over HTTP: {output_path}")
                     else:
-                        print(f"wget download failed or produced empty file for {file_id}")
-                except subprocess.CalledProcessError as e:
-                    print(f"wget failed for {file_id}: {str(e)}")
+                        print(f"HTTP download produced empty file for {file_id}")
+                except requests.RequestException as e:
+                    print(f"HTTP download failed for {file_id}: {str(e)}")
             
             # Check if file is a zip and needs to be renamed
-            if success:
+            if success and not already_typed:
                 try:
                     import magic  # python-magic library for file type detection
                     file_type = magic.from_file(output_path, mime=True)
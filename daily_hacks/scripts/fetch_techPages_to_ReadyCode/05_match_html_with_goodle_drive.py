@@ -1,36 +1,69 @@
 #!/usr/bin/env python3
 import os
 import re
+import csv
 import hashlib
 import zipfile
-import tempfile
 from datetime import datetime
 import difflib
-from bs4 import BeautifulSoup
+import html
+from bs4 import BeautifulSoup, SoupStrainer
 import argparse
-
-def get_file_fingerprint(filepath):
-    """Create a content fingerprint of the file."""
-    with open(filepath, 'rb') as f:
-        content = f.read()
-        return hashlib.md5(content).hexdigest()
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+try:
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer  # optional vectorized matching
+except ImportError:
+    TfidfVectorizer = None
+
+try:
+    from rapidfuzz import fuzz  # optional fast similarity
+except ImportError:
+    fuzz = None
+
+try:
+    from datasketch import MinHash, MinHashLSH  # optional candidate prefilter
+except ImportError:
+    MinHashLSH = None
+
+# Look for patterns that might represent Google Drive IDs
+# Common pattern for Google Drive file IDs
+DRIVE_ID_RE = re.compile(rb'[\w-]{25,33}')
+# Headers of Drive file types that hold no comparable text
+BINARY_SIGNATURES = (b'%PDF', b'\xff\xd8\xff', b'\x89PNG', b'GIF8')
+TITLE_RE = re.compile(rb'<title[^>]*>([^<]*)</title>', re.IGNORECASE)
+
+def get_file_fingerprint(filepath, chunk_size=1 << 20):
+    """Create a content fingerprint of the file, hashing it in chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb', buffering=chunk_size) as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 def get_html_title(html_file):
     """Extract title from HTML file."""
     try:
-        with open(html_file, 'r', encoding='utf-8') as f:
+        with open(html_file, 'rb') as f:
             content = f.read()
-            soup = BeautifulSoup(content, 'html.parser')
-            return soup.title.string if soup.title else None
+        # Fast path: pull the title straight out of the raw bytes
+        match = TITLE_RE.search(content)
+        if match:
+            return html.unescape(match.group(1).decode('utf-8', errors='ignore')).strip()
+        # Otherwise parse only the <title> element
+        soup = BeautifulSoup(content, 'lxml', parse_only=SoupStrainer('title'))
+        return soup.title.string if soup.title else None
     except:
         return None
 
 def get_html_content_text(html_file):
     """Extract text content from HTML file."""
     try:
-        with open(html_file, 'r', encoding='utf-8') as f:
+        with open(html_file, 'r', encoding='utf-8', buffering=1 << 20) as f:
             content = f.read()
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = BeautifulSoup(content, 'lxml')
             # Remove script and style elements
             for script in soup(["script", "style"]):
                 script.decompose()
@@ -42,32 +75,66 @@ def get_html_content_text(html_file):
 def get_google_drive_id_from_html(html_file):
     """Try to find Google Drive IDs in the HTML content."""
     try:
-        with open(html_file, 'r', encoding='utf-8') as f:
+        with open(html_file, 'rb') as f:
             content = f.read()
-            # Look for patterns that might represent Google Drive IDs
-            # Common pattern for Google Drive file IDs
-            pattern = r'[\w-]{25,33}'
-            matches = re.findall(pattern, content)
-            return matches
+        # Scan the raw bytes and only decode the candidate IDs
+        return [m.decode('ascii') for m in DRIVE_ID_RE.findall(content)]
     except:
         return []
 
-def compare_text_similarity(text1, text2):
-    """Compare similarity between two text strings."""
-    return difflib.SequenceMatcher(None, text1, text2).ratio()
+def compare_text_similarity(text1, text2, threshold=0.3):
+    """
+    Compare similarity between two text strings.
+    With RapidFuzz this is its normalized Indel ratio, and scores below the
+    threshold are cut off early. Otherwise difflib compares line by line;
+    quick_ratio() is an upper bound on ratio(), so pairs that cannot reach
+    the threshold skip the full comparison.
+    """
+    if fuzz is not None:
+        return fuzz.ratio(text1, text2, score_cutoff=threshold * 100) / 100.0
+
+    matcher = difflib.SequenceMatcher(None, text1.splitlines(), text2.splitlines(), autojunk=False)
+    upper_bound = matcher.quick_ratio()
+    if upper_bound <= threshold:
+        return upper_bound
+    return matcher.ratio()
+
+def similarity_upper_bound(text1, text2):
+    """
+    Highest score compare_text_similarity() can give two texts of these sizes.
+    Both scores are 2*M / (len1 + len2) with M <= min(len1, len2), counted in
+    characters for RapidFuzz and in lines for difflib.
+    """
+    if fuzz is not None:
+        len1, len2 = len(text1), len(text2)
+    else:
+        len1, len2 = len(text1.splitlines()), len(text2.splitlines())
+    return 2 * min(len1, len2) / max(len1 + len2, 1)
+
+def text_minhash(text, k=5, num_perm=128):
+    """Build a MinHash signature over the character k-shingles of a text."""
+    mh = MinHash(num_perm=num_perm)
+    shingles = {text[i:i + k] for i in range(max(len(text) - k + 1, 1))}
+    mh.update_batch([shingle.encode('utf-8') for shingle in shingles])
+    return mh
+
+def read_header(filepath, size=8):
+    """Read the first bytes of a file, or b'' if it cannot be read."""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read(size)
+    except:
+        return b''
 
-def is_zip_file(filepath):
+def is_zip_file(filepath, header=None):
     """Check if the file is a ZIP archive."""
     if filepath.endswith('.zip'):
         return True
 
     # Check file header for ZIP signature
-    try:
-        with open(filepath, 'rb') as f:
-            header = f.read(4)
-            return header.startswith(b'PK\x03\x04')
-    except:
-        return False
+    if header is None:
+        header = read_header(filepath)
+    return header.startswith(b'PK\x03\x04')
 
 def extract_text_from_zip(zip_file):
     """Extract text content from ZIP file."""
@@ -81,16 +148,9 @@ def extract_text_from_zip(zip_file):
                 # Limit to first 5 text files to avoid processing too much
                 for file in text_files[:5]:
                     try:
-                        with tempfile.NamedTemporaryFile(delete=False) as temp:
-                            temp.write(z.read(file))
-                            temp_filename = temp.name
-
-                        # Read extracted file content
-                        with open(temp_filename, 'r', encoding='utf-8', errors='ignore') as f:
-                            result_text += f.read() + "\n\n"
-
-                        # Clean up
-                        os.unlink(temp_filename)
+                        # Read the member straight out of the archive
+                        with z.open(file) as member:
+                            result_text += member.read().decode('utf-8', errors='ignore') + "\n\n"
                     except:
                         continue
         return result_text
@@ -98,26 +158,127 @@ def extract_text_from_zip(zip_file):
         print(f"Error processing ZIP file {zip_file}: {e}")
         return ""
 
-def get_file_content_for_comparison(file_path):
-    """Get content from a file for comparison, handling different file types."""
+def get_file_content_for_comparison(file_path, max_chars=None):
+    """
+    Get content from a file for comparison, handling different file types.
+    Plain-text files are read only up to max_chars, and known binary formats
+    are skipped without reading them.
+    """
     # For HTML files
     if file_path.endswith('.html'):
         return get_html_content_text(file_path)
 
+    # Sniff the header once for both the ZIP and the binary checks
+    header = read_header(file_path)
+
     # For ZIP files
-    if is_zip_file(file_path):
+    if is_zip_file(file_path, header):
         return extract_text_from_zip(file_path)
 
+    # Binary formats have no text worth comparing
+    if header.startswith(BINARY_SIGNATURES):
+        return ""
+
     # For text files
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            return f.read()
+        with open(file_path, 'r', encoding='utf-8', errors='ignore', buffering=1 << 20) as f:
+            return f.read(max_chars if max_chars is not None else -1)
     except:
         # For binary files, return an empty string
         return ""
 
-def match_files(html_dir, drive_dir, output_file="matches.csv"):
-    """Find potential matches between HTML files and Google Drive files."""
+def best_matches_tfidf(html_texts, drive_texts, threshold=0.3, n_jobs=None):
+    """
+    Find the best Drive match for each HTML text by TF-IDF cosine similarity.
+    All pairs are scored in one sparse matrix product.
+    Returns {html_file: (drive_file, score)} for matches above the threshold.
+    """
+    html_names = list(html_texts)
+    drive_names = list(drive_texts)
+
+    vectorizer = TfidfVectorizer()
+    try:
+        X_html = vectorizer.fit_transform(html_texts.values())
+    except ValueError:
+        # No usable words in any HTML text (empty vocabulary)
+        return best_matches_pairwise(html_texts, drive_texts, threshold, n_jobs)
+    X_drive = vectorizer.transform(drive_texts.values())
+
+    # Rows are L2-normalised, so the dot product is the cosine similarity
+    sim = (X_html @ X_drive.T).tocsr()
+    best_cols = np.asarray(sim.argmax(axis=1)).ravel()
+    best_scores = sim.max(axis=1).toarray().ravel()
+
+    return {
+        html_names[row]: (drive_names[col], float(score))
+        for row, (col, score) in enumerate(zip(best_cols, best_scores))
+        if score > threshold
+    }
+
+# Drive texts shared with pool workers, set once per worker by the initializer
+_worker_drive_texts = {}
+
+def _init_compare_worker(drive_texts):
+    """Pool initializer: hand the Drive texts to the worker once."""
+    global _worker_drive_texts
+    _worker_drive_texts = drive_texts
+
+def compare_one_html(task):
+    """Pool task: score one HTML text against its candidate Drive files."""
+    html_file, html_content, candidates, threshold = task
+    best_match = None
+    best_score = 0
+
+    for drive_file in candidates:
+        drive_content = _worker_drive_texts[drive_file]
+        # Texts of very different length cannot be similar enough to match
+        if similarity_upper_bound(html_content, drive_content) < threshold:
+            continue
+        similarity = compare_text_similarity(html_content, drive_content, threshold)
+
+        if similarity > best_score and similarity > threshold:
+            best_score = similarity
+            best_match = drive_file
+
+    return html_file, best_match, best_score
+
+def best_matches_pairwise(html_texts, drive_texts, threshold=0.3, n_jobs=None):
+    """
+    Find the best Drive match for each HTML text with difflib.
+    When datasketch is available, a MinHash LSH index narrows each HTML
+    file down to likely candidates first. HTML files are scored in
+    parallel across n_jobs processes.
+    Returns {html_file: (drive_file, score)} for matches above the threshold.
+    """
+    lsh = None
+    if MinHashLSH is not None:
+        lsh = MinHashLSH(threshold=0.2, num_perm=128)
+        for drive_file, drive_content in drive_texts.items():
+            lsh.insert(drive_file, text_minhash(drive_content))
+
+    tasks = []
+    for html_file, html_content in html_texts.items():
+        if lsh is not None:
+            found = set(lsh.query(text_minhash(html_content)))
+            candidates = [f for f in drive_texts if f in found]
+        else:
+            candidates = list(drive_texts)
+        tasks.append((html_file, html_content, candidates, threshold))
+
+    best_matches = {}
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_compare_worker,
+                             initargs=(drive_texts,)) as executor:
+        for html_file, best_match, best_score in executor.map(compare_one_html, tasks, chunksize=8):
+            if best_match:
+                best_matches[html_file] = (best_match, best_score)
+    return best_matches
+
+def match_files(html_dir, drive_dir, output_file="matches.csv", n_jobs=None):
+    """
+    Find potential matches between HTML files and Google Drive files.
+    Text extraction and pairwise comparison run on n_jobs processes
+    (default: one per CPU).
+    """
     html_files = [os.path.join(html_dir, f) for f in os.listdir(html_dir) if f.endswith('.html')]
     drive_files = [os.path.join(drive_dir, f) for f in os.listdir(drive_dir) if os.path.isfile(os.path.join(drive_dir, f))]
 
@@ -153,30 +314,36 @@ def match_files(html_dir, drive_dir, output_file="matches.csv"):
 
     # Second pass: Use file fingerprinting for binary files and content comparison for text
     print("Pass 2: Comparing content between HTML and drive files...")
-    matched_html_files = [m[0] for m in matches]
-    unmatched_html_files = [f for f in html_files if f not in matched_html_files]
-
-    for html_file in unmatched_html_files:
-        html_content = get_html_content_text(html_file)
-        if not html_content:
-            continue
-
-        best_match = None
-        best_score = 0
-
-        for drive_file in drive_files:
-            # Try to get content from drive file
-            drive_content = get_file_content_for_comparison(drive_file)
-
-            if drive_content:
-                # For text content, use text similarity
-                similarity = compare_text_similarity(html_content[:5000], drive_content[:5000])
-
-                if similarity > best_score and similarity > 0.3:  # Threshold can be adjusted
-                    best_score = similarity
-                    best_match = drive_file
+    # html_match_count holds exactly the matched HTML files, so use it as the lookup set
+    unmatched_html_files = [f for f in html_files if f not in html_match_count]
 
-        if best_match:
+    # Read each Drive file once up front instead of once per HTML file,
+    # and extract the comparison text of each unmatched HTML file
+    drive_texts = {}
+    html_texts = {}
+    if unmatched_html_files:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            read_drive_text = partial(get_file_content_for_comparison, max_chars=5000)
+            drive_contents = executor.map(read_drive_text, drive_files, chunksize=8)
+            for drive_file, drive_content in zip(drive_files, drive_contents):
+                if drive_content:
+                    drive_texts[drive_file] = drive_content[:5000]
+
+            html_contents = executor.map(get_html_content_text, unmatched_html_files, chunksize=8)
+            for html_file, html_content in zip(unmatched_html_files, html_contents):
+                if html_content:
+                    html_texts[html_file] = html_content[:5000]
+
+    best_matches = {}
+    if html_texts and drive_texts:
+        if TfidfVectorizer is not None:
+            best_matches = best_matches_tfidf(html_texts, drive_texts, n_jobs=n_jobs)
+        else:
+            best_matches = best_matches_pairwise(html_texts, drive_texts, n_jobs=n_jobs)
+
+    for html_file in html_texts:
+        if html_file in best_matches:
+            best_match, best_score = best_matches[html_file]
             matches.append((html_file, best_match, "content_similarity", best_score))
             
             # Update match counters
@@ -185,8 +352,8 @@ def match_files(html_dir, drive_dir, output_file="matches.csv"):
 
     # Third pass: For remaining unmatched files, try date-based matching
     print("Pass 3: Using date-based matching for remaining files...")
-    matched_html_files = [m[0] for m in matches]
-    unmatched_html_files = [f for f in html_files if f not in matched_html_files]
+    # html_match_count holds exactly the matched HTML files, so use it as the lookup set
+    unmatched_html_files = [f for f in html_files if f not in html_match_count]
 
     html_dates = [(f, datetime.fromtimestamp(os.path.getmtime(f))) for f in unmatched_html_files]
     drive_dates = [(f, datetime.fromtimestamp(os.path.getmtime(f))) for f in drive_files]
@@ -222,17 +389,22 @@ def match_files(html_dir, drive_dir, output_file="matches.csv"):
         matches.append(("NO_MATCH", drive_file, "no_match", 0.0))
         drive_match_count[drive_file] = 0
 
-    # Write results to file
-    with open(output_file, 'w') as f:
-        f.write("HTML File,Drive File,Match Method,Confidence,Is Unique Match\n")
-        for html_file, drive_file, method, confidence in matches:
-            html_basename = os.path.basename(html_file) if html_file != "NO_MATCH" else "NO_MATCH"
-            drive_basename = os.path.basename(drive_file) if drive_file != "NO_MATCH" else "NO_MATCH"
-            
-            # Determine if this is a unique match (both file has only one match)
-            is_unique = "yes" if (html_file == "NO_MATCH" or html_match_count[html_file] == 1) and (drive_file == "NO_MATCH" or drive_match_count[drive_file] == 1) else "no"
-            
-            f.write(f'"{html_basename}","{drive_basename}",{method},{confidence:.2f},{is_unique}\n')
+    # Build the result rows
+    rows = []
+    for html_file, drive_file, method, confidence in matches:
+        html_basename = os.path.basename(html_file) if html_file != "NO_MATCH" else "NO_MATCH"
+        drive_basename = os.path.basename(drive_file) if drive_file != "NO_MATCH" else "NO_MATCH"
+        
+        # Determine if this is a unique match (both file has only one match)
+        is_unique = "yes" if (html_file == "NO_MATCH" or html_match_count[html_file] == 1) and (drive_file == "NO_MATCH" or drive_match_count[drive_file] == 1) else "no"
+        
+        rows.append((html_basename, drive_basename, method, f"{confidence:.2f}", is_unique))
+
+    # Write results to file; csv takes care of quoting names with commas or quotes
+    with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(["HTML File", "Drive File", "Match Method", "Confidence", "Is Unique Match"])
+        writer.writerows(rows)
 
     print(f"Found {len(matches)} potential matches. Results written to {output_file}")
     print(f"- {len(unmatched_html_files)} HTML files without matches")
@@ -244,7 +416,8 @@ if __name__ == "__main__":
     parser.add_argument('html_dir', help='Directory containing HTML files')
     parser.add_argument('drive_dir', help='Directory containing Google Drive files')
     parser.add_argument('--output', default='matches.csv', help='Output CSV file')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
 
     args = parser.parse_args()
-    match_files(args.html_dir, args.drive_dir, args.output)
+    match_files(args.html_dir, args.drive_dir, args.output, args.jobs)
 
@@ -5,51 +5,69 @@ import sys
 
 
 
-# how to run: find ./downloaded_drive_files/ -type f -not -path "*/\.*" | grep -v ".zip" | xargs -I{} python 06_check_file_format.py  "{}"
+# how to run: find ./downloaded_drive_files/ -type f -not -path "*/\.*" | grep -v ".zip" | python 06_check_file_format.py -
+
+# Dictionary of common file signatures (magic numbers) and their corresponding extensions
+SIGNATURES = {
+    b'PK\x03\x04': '.zip',                   # ZIP archive
+    b'%PDF': '.pdf',                         # PDF document
+    b'\xFF\xD8\xFF': '.jpg',                 # JPEG image
+    b'\x89PNG\r\n\x1A\n': '.png',            # PNG image
+    b'GIF8': '.gif',                         # GIF image
+    b'\x25\x21PS': '.ps',                    # PostScript file
+    b'\x7FELF': '.elf',                      # ELF file
+    b'\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1': '.doc',  # MS Office file
+    b'Rar!\x1A\x07\x00': '.rar',             # RAR archive
+    b'Rar!\x1A\x07\x01\x00': '.rar',         # RAR archive 5.0
+    b'\x50\x4B\x05\x06': '.zip',             # Empty ZIP archive
+    b'\x50\x4B\x07\x08': '.zip',             # Spanned ZIP archive
+    b'BZh': '.bz2',                          # BZip2 archive
+    b'\x1F\x8B\x08': '.gz',                  # GZip archive
+    b'SQLite format 3\x00': '.sqlite',       # SQLite database
+    b'\x00\x00\x01\x00': '.ico',             # ICO image
+    b'II*\x00': '.tif',                      # TIFF image
+    b'MM\x00*': '.tif',                      # TIFF image
+    b'\x00\x01\x00\x00\x00': '.ttf',         # TrueType font
+    b'OTTO': '.otf',                         # OpenType font
+    b'\x1A\x45\xDF\xA3': '.webm',            # WebM video
+    b'\x52\x49\x46\x46': '.wav',             # WAV audio
+}
+
+# Signatures bucketed by length, longest first, so a lookup is one dict
+# hit per distinct length instead of a startswith per signature
+SIGNATURES_BY_LENGTH = {}
+for _signature, _extension in sorted(SIGNATURES.items(), key=lambda item: -len(item[0])):
+    SIGNATURES_BY_LENGTH.setdefault(len(_signature), {})[_signature] = _extension
+
+# Printable ASCII plus common whitespace, as accepted by the text-file check
+TEXT_BYTES = bytes(range(32, 127)) + b'\n\r\t'
+
+def identify_signature(header):
+    """Return the extension for the file signature at the start of header, or None."""
+    for length, table in SIGNATURES_BY_LENGTH.items():
+        extension = table.get(header[:length])
+        if extension:
+            return extension
+    return None
 
 def check_file_type(file_path):
     """
     Check the file type based on its header bytes and rename it appropriately.
     """
-    # Dictionary of common file signatures (magic numbers) and their corresponding extensions
-    signatures = {
-        b'PK\x03\x04': '.zip',                   # ZIP archive
-        b'%PDF': '.pdf',                         # PDF document
-        b'\xFF\xD8\xFF': '.jpg',                 # JPEG image
-        b'\x89PNG\r\n\x1A\n': '.png',            # PNG image
-        b'GIF8': '.gif',                         # GIF image
-        b'\x25\x21PS': '.ps',                    # PostScript file
-        b'\x7FELF': '.elf',                      # ELF file
-        b'\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1': '.doc',  # MS Office file
-        b'Rar!\x1A\x07\x00': '.rar',             # RAR archive
-        b'Rar!\x1A\x07\x01\x00': '.rar',         # RAR archive 5.0
-        b'\x50\x4B\x05\x06': '.zip',             # Empty ZIP archive
-        b'\x50\x4B\x07\x08': '.zip',             # Spanned ZIP archive
-        b'BZh': '.bz2',                          # BZip2 archive
-        b'\x1F\x8B\x08': '.gz',                  # GZip archive
-        b'SQLite format 3\x00': '.sqlite',       # SQLite database
-        b'\x00\x00\x01\x00': '.ico',             # ICO image
-        b'II*\x00': '.tif',                      # TIFF image
-        b'MM\x00*': '.tif',                      # TIFF image
-        b'\x00\x01\x00\x00\x00': '.ttf',         # TrueType font
-        b'OTTO': '.otf',                         # OpenType font
-        b'\x1A\x45\xDF\xA3': '.webm',            # WebM video
-        b'\x52\x49\x46\x46': '.wav',             # WAV audio
-    }
-    
     # Try to determine file type by reading the header
     header_size = 16  # Read first 16 bytes to cover most signatures
+    text_probe_size = 100  # Bytes inspected by the plain-text check
     
     try:
-        with open(file_path, 'rb') as f:
-            header = f.read(header_size)
+        # A single positioned read covers both the signature and the text probe
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            start = os.pread(fd, max(header_size, text_probe_size), 0)
+        finally:
+            os.close(fd)
             
         # Check for various file signatures
-        file_type = None
-        for signature, extension in signatures.items():
-            if header.startswith(signature):
-                file_type = extension
-                break
+        file_type = identify_signature(start[:header_size])
         
         # If we found a match, rename the file
         if file_type:
@@ -61,16 +79,15 @@ def check_file_type(file_path):
         else:
             print("Could not identify file type from signature.")
             
-            # Additional check for text files
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    start = f.read(100)
-                    if start and all(32 <= ord(c) <= 126 or c in '\n\r\t' for c in start):
-                        print("File appears to be a text file.")
-                        new_path = file_path + '.txt'
-                        print(f"Renaming to: {new_path}")
-                        shutil.move(file_path, new_path)
-            except UnicodeDecodeError:
+            # Additional check for text files: deleting every printable byte
+            # must leave nothing behind
+            start = start[:text_probe_size]
+            if start and not start.translate(None, TEXT_BYTES):
+                print("File appears to be a text file.")
+                new_path = file_path + '.txt'
+                print(f"Renaming to: {new_path}")
+                shutil.move(file_path, new_path)
+            else:
                 print("File is likely a binary file of unknown format.")
         
         return True
@@ -79,16 +96,25 @@ def check_file_type(file_path):
         return False
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python check_file_type.py <file_path>")
+    if len(sys.argv) < 2:
+        print("Usage: python 06_check_file_format.py <file_path> [<file_path> ...]")
+        print("       find ... | python 06_check_file_format.py -")
         sys.exit(1)
         
-    file_path = sys.argv[1]
-    if not os.path.exists(file_path):
-        print(f"File not found: {file_path}")
+    # Check every path in this one process; "-" reads one path per line from stdin
+    if sys.argv[1:] == ["-"]:
+        file_paths = [line for line in sys.stdin.read().splitlines() if line]
+    else:
+        file_paths = sys.argv[1:]
+    
+    missing = 0
+    for file_path in file_paths:
+        if not os.path.exists(file_path):
+            print(f"File not found: {file_path}")
+            missing += 1
+            continue
+        print(f"Checking {file_path}")
+        check_file_type(file_path)
+    
+    if missing:
         sys.exit(1)
-        
-    check_file_type(file_path)
-
-
-
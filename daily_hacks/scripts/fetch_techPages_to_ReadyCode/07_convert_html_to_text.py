@@ -7,23 +7,30 @@ import justext
 import trafilatura
 from readability import Document
 import csv
+import copy
+from lxml import html as lxml_html
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-def extract_content_with_readability(html_content):
+def extract_content_with_readability(html_content, tree=None):
     """Extract main content using readability-lxml library."""
     try:
-        doc = Document(html_content)
+        # readability cleans a copy of a pre-parsed tree, so it can be shared
+        doc = Document(tree if tree is not None else html_content)
         content = doc.summary()
         # Clean up the extracted content
-        soup = BeautifulSoup(content, 'html.parser')
+        soup = BeautifulSoup(content, 'lxml')
         return soup.get_text(separator='\n\n').strip()
     except Exception as e:
         print(f"Readability extraction failed: {e}")
         return None
 
-def extract_content_with_trafilatura(html_content):
+def extract_content_with_trafilatura(html_content, tree=None):
     """Extract main content using trafilatura library."""
     try:
-        extracted = trafilatura.extract(html_content, include_comments=False, 
+        # trafilatura edits the tree it is given, so it works on its own copy
+        source = copy.deepcopy(tree) if tree is not None else html_content
+        extracted = trafilatura.extract(source, include_comments=False, 
                                        include_tables=True, include_images=False,
                                        output_format='text')
         return extracted
@@ -31,8 +38,8 @@ def extract_content_with_trafilatura(html_content):
         print(f"Trafilatura extraction failed: {e}")
         return None
 
-def extract_content_with_justext(html_content):
-    """Extract main content using justext library."""
+def extract_content_with_justext(html_content, tree=None):
+    """Extract main content using justext library (it only accepts markup, so tree is unused)."""
     try:
         paragraphs = justext.justext(html_content, justext.get_stoplist("English"))
         content_parts = []
@@ -44,6 +51,13 @@ def extract_content_with_justext(html_content):
         print(f"Justext extraction failed: {e}")
         return None
 
+# Extraction methods by name, in the order they are tried for --method all
+EXTRACTORS = {
+    'readability': extract_content_with_readability,
+    'trafilatura': extract_content_with_trafilatura,
+    'justext': extract_content_with_justext,
+}
+
 def extract_blog_content(html_file, output_dir, method='all'):
     """Extract blog content from HTML file using specified method(s)."""
     try:
@@ -56,54 +70,41 @@ def extract_blog_content(html_file, output_dir, method='all'):
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
-        # Track extraction success
-        extraction_results = {}
-        
-        # Different extraction methods
-        if method in ['readability', 'all']:
-            readability_text = extract_content_with_readability(html_content)
-            if readability_text:
-                readability_output = os.path.join(output_dir, f"{filename_no_ext}_readability.txt")
-                with open(readability_output, 'w', encoding='utf-8') as f:
-                    f.write(readability_text)
-                extraction_results['readability'] = len(readability_text)
+        # Parse once and share the tree with the extractors that accept one
+        methods = list(EXTRACTORS) if method == 'all' else [method]
+        tree = None
+        if set(methods) & {'readability', 'trafilatura'}:
+            try:
+                tree = lxml_html.fromstring(html_content)
+            except Exception as e:
+                print(f"Could not pre-parse {html_file}, extractors will parse it themselves: {e}")
         
-        if method in ['trafilatura', 'all']:
-            trafilatura_text = extract_content_with_trafilatura(html_content)
-            if trafilatura_text:
-                trafilatura_output = os.path.join(output_dir, f"{filename_no_ext}_trafilatura.txt")
-                with open(trafilatura_output, 'w', encoding='utf-8') as f:
-                    f.write(trafilatura_text)
-                extraction_results['trafilatura'] = len(trafilatura_text)
+        # Run the requested extractor(s), keeping each result in memory.
+        # The extractors are independent, so for 'all' they run side by side.
+        with ThreadPoolExecutor(max_workers=len(methods)) as executor:
+            futures = {name: executor.submit(EXTRACTORS[name], html_content, tree) for name in methods}
+        texts = {}
+        for name, future in futures.items():
+            text = future.result()
+            if text:
+                texts[name] = text
+                method_output = os.path.join(output_dir, f"{filename_no_ext}_{name}.txt")
+                with open(method_output, 'w', encoding='utf-8') as f:
+                    f.write(text)
         
-        if method in ['justext', 'all']:
-            justext_text = extract_content_with_justext(html_content)
-            if justext_text:
-                justext_output = os.path.join(output_dir, f"{filename_no_ext}_justext.txt")
-                with open(justext_output, 'w', encoding='utf-8') as f:
-                    f.write(justext_text)
-                extraction_results['justext'] = len(justext_text)
+        # Track extraction success
+        extraction_results = {name: len(text) for name, text in texts.items()}
         
         # Determine the best extraction (most content) if we used multiple methods
         if method == 'all' and extraction_results:
             best_method = max(extraction_results, key=extraction_results.get)
-            best_source = None
-            
-            if best_method == 'readability':
-                best_source = os.path.join(output_dir, f"{filename_no_ext}_readability.txt")
-            elif best_method == 'trafilatura':
-                best_source = os.path.join(output_dir, f"{filename_no_ext}_trafilatura.txt")
-            elif best_method == 'justext':
-                best_source = os.path.join(output_dir, f"{filename_no_ext}_justext.txt")
             
-            if best_source:
-                best_output = os.path.join(output_dir, f"{filename_no_ext}.txt")
-                with open(best_source, 'r', encoding='utf-8') as src:
-                    content = src.read()
-                    with open(best_output, 'w', encoding='utf-8') as dst:
-                        dst.write(content)
+            # Write the winner straight from memory rather than copying its file
+            best_output = os.path.join(output_dir, f"{filename_no_ext}.txt")
+            with open(best_output, 'w', encoding='utf-8') as f:
+                f.write(texts[best_method])
             
-            return best_method, extraction_results.get(best_method, 0)
+            return best_method, extraction_results[best_method]
         
         return method, extraction_results.get(method, 0)
     
@@ -111,21 +112,23 @@ def extract_blog_content(html_file, output_dir, method='all'):
         print(f"Error processing {html_file}: {e}")
         return None, 0
 
-def process_directory(html_dir, output_dir, method='trafilatura'):
-    """Process all HTML files in a directory."""
+def process_directory(html_dir, output_dir, method='trafilatura', n_jobs=None):
+    """Process all HTML files in a directory, across n_jobs processes."""
     html_files = [os.path.join(html_dir, f) for f in os.listdir(html_dir) if f.endswith('.html')]
     results = []
     
     print(f"Processing {len(html_files)} HTML files...")
     
-    for i, html_file in enumerate(html_files):
-        print(f"Processing {i+1}/{len(html_files)}: {os.path.basename(html_file)}")
-        best_method, content_size = extract_blog_content(html_file, output_dir, method)
-        results.append({
-            'file': os.path.basename(html_file),
-            'method': best_method,
-            'content_size': content_size
-        })
+    extract = partial(extract_blog_content, output_dir=output_dir, method=method)
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        extracted = executor.map(extract, html_files, chunksize=4)
+        for i, (html_file, (best_method, content_size)) in enumerate(zip(html_files, extracted)):
+            print(f"Processed {i+1}/{len(html_files)}: {os.path.basename(html_file)}")
+            results.append({
+                'file': os.path.basename(html_file),
+                'method': best_method,
+                'content_size': content_size
+            })
     
     # Write extraction report
     report_path = os.path.join(output_dir, "extraction_report.csv")
@@ -144,6 +147,7 @@ if __name__ == "__main__":
     parser.add_argument('--method', default='all', 
                         choices=['all', 'readability', 'trafilatura', 'justext'],
                         help='Content extraction method to use')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
     
     args = parser.parse_args()
-    process_directory(args.html_dir, args.output, args.method)
\ No newline at end of file
+    process_directory(args.html_dir, args.output, args.method, args.jobs)
\ No newline at end of file
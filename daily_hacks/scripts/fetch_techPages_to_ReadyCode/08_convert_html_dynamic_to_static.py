@@ -1,27 +1,48 @@
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
 import os
+from concurrent.futures import ProcessPoolExecutor
 # Directory containing the HTML files
 html_directory = "/Users/kbillis/tmp_BO_trading/2nd_attempt"  # Replace with your directory
 output_directory = "/Users/kbillis/tmp_BO_trading/2nd_attempt_stat"  # Replace with your desired directory
 
 
-# Ensure the output directory exists
-os.makedirs(output_directory, exist_ok=True)
+def make_static(file_name):
+    """Strip <script> tags from one HTML file and save it to the output directory.
 
-# Process each HTML file
-for file_name in os.listdir(html_directory):
-    if file_name.endswith(".html"):  # Only process .html files
-        file_path = os.path.join(html_directory, file_name)
-        output_path = os.path.join(output_directory, file_name)
+    Returns (output_path, None) on success, or (file_path, error message) if the
+    file could not be converted, so one bad file doesn't stop the batch.
+    """
+    file_path = os.path.join(html_directory, file_name)
+    output_path = os.path.join(output_directory, file_name)
 
-        # Parse the HTML file and remove <script> tags
-        with open(file_path, "r", encoding="utf-8") as html_file:
-            soup = BeautifulSoup(html_file, "html.parser")
-            for script in soup.find_all("script"):
-                script.decompose()  # Remove <script> tags
+    try:
+        # Parse the HTML file and remove <script> tags in place
+        tree = lxml_html.parse(file_path, parser=lxml_html.HTMLParser(encoding="utf-8"))
+        if tree.getroot() is None:
+            # Empty (or whitespace-only) file: nothing to strip, save it empty
+            open(output_path, "w", encoding="utf-8").close()
+            return output_path, None
+        for script in list(tree.iter("script")):
+            script.drop_tree()  # Remove <script> tags, keeping any trailing text
 
-        # Save the modified HTML to the output directory
-        with open(output_path, "w", encoding="utf-8") as output_file:
-            output_file.write(str(soup))
+        # Serialize once, straight to the output directory
+        tree.write(output_path, encoding="utf-8", method="html")
+    except (OSError, etree.LxmlError, AssertionError) as e:
+        return file_path, str(e)
 
-        print(f"Saved static HTML: {output_path}")
+    return output_path, None
+
+
+if __name__ == "__main__":
+    # Ensure the output directory exists
+    os.makedirs(output_directory, exist_ok=True)
+
+    # Process the .html files in parallel, one parse per worker process
+    file_names = [f for f in os.listdir(html_directory) if f.endswith(".html")]
+    with ProcessPoolExecutor() as executor:
+        for path, error in executor.map(make_static, file_names, chunksize=4):
+            if error is None:
+                print(f"Saved static HTML: {path}")
+            else:
+                print(f"Could not convert {path}: {error}")
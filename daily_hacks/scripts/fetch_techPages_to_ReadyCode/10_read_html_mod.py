@@ -1,40 +1,335 @@
 #!/usr/bin/env python3
 import argparse
+import functools
+import hashlib
 import os
+import pathlib
 import re
 import subprocess
 import tempfile
 import json
-from bs4 import BeautifulSoup
-import requests
+import shlex
 import shutil
+import string
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Faster JSON decoding for the streamed model output, when available;
+# orjson's decode error subclasses json.JSONDecodeError
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Patterns used on every code block / model response, compiled once
+_FILENAME_RE = re.compile(r'filename[:\s]+([^\s]+)', re.IGNORECASE)
+_JSON_BLOB_RE = re.compile(r'\{[\s\S]*\}')
+_LANG_CLASS_RE = re.compile(r'^(?:language|lang)-(.+)$')
+_SAFE_NAME_RE = re.compile(r'[^A-Za-z0-9._-]+')
+_WORD_RE = re.compile(r'\S+')
+_JSON_ARRAY_RE = re.compile(r'\[[\s\S]*\]')
+
+# File extension for each language name found in a code block's class
+_EXTENSIONS = {
+    "python": "py", "py": "py",
+    "javascript": "js", "js": "js",
+    "html": "html",
+    "css": "css",
+    "shell": "sh", "bash": "sh", "sh": "sh",
+}
+
+# What the model is asked to report about each document
+_ANALYSIS_FIELDS = """1. The main purpose of the code
+2. The proper order to run the files
+3. Required dependencies
+4. Command to run the code with an input file
+5. Expected input file format
+6. Expected output
+"""
+
+_ANALYSIS_SCHEMA = """{
+    "purpose": "Brief description of what the code does",
+    "execution_order": ["file1.py", "file2.py", ...],
+    "dependencies": ["package1", "package2", ...],
+    "run_command": "python main.py input_file",
+    "input_format": "Description of the expected input format",
+    "output_description": "Description of the expected output"
+}
+"""
+
+# Invariant instructions, sent as the system prompt ahead of the per-call
+# content so the server can reuse its cached prefix between calls
+_SYSTEM_PROMPT = """You analyze code files and instructions extracted from a web page.
+
+Please provide the following information in JSON format:
+""" + _ANALYSIS_FIELDS + """
+The JSON format should be:
+""" + _ANALYSIS_SCHEMA
+
+_BATCH_SYSTEM_PROMPT = """You analyze several documents, each with code files and instructions extracted from a web page.
+
+For each document, provide the following information:
+""" + _ANALYSIS_FIELDS + """
+Return a JSON array with one object per document, in the order given, each in the format:
+""" + _ANALYSIS_SCHEMA
+
+# Fixed closing line of every prompt, so only the middle varies between calls
+_PROMPT_SUFFIX = "\n\nRespond with the JSON only, in the format given above."
+
+# Rough characters per token, for budgeting without tiktoken
+_CHARS_PER_TOKEN = 4
+
+# Token budgets for the instructions and for each code file of a document
+_INSTRUCTION_TOKENS = 1250
+_CODE_FILE_TOKENS = 500
+
+# Context window requested from Ollama, and how long it keeps the model
+# loaded after a call so consecutive files skip the reload
+_NUM_CTX = 8192
+_KEEP_ALIVE = "30m"
+
+# Where analyses are cached, keyed on the model, the prompts and the document content
+_CACHE_DIR = "~/.cache/ollama_html_parser"
+# Editing the prompts (or the schema inside them) changes this, so analyses
+# made with older prompts are not served
+_PROMPT_KEY = hashlib.blake2b(
+    (_SYSTEM_PROMPT + _BATCH_SYSTEM_PROMPT + _PROMPT_SUFFIX).encode(), digest_size=8).hexdigest()
+
+# Context left for each document's JSON answer in a batched call; a batch
+# whose prompt plus answers would not fit in _NUM_CTX goes one call per file
+_ANSWER_TOKENS_PER_DOC = 300
+
+# Script written next to the extracted code by create_runner_script; the
+# substitutions are Python literals (or a comment line for $purpose)
+_RUNNER_TEMPLATE = string.Template("""#!/usr/bin/env python3
+# Auto-generated runner script for $purpose
+import os
+import sys
+import subprocess
+import shutil
+
+def check_dependencies():
+    required = $dependencies
+    missing = []
+    
+    for pkg in required:
+        try:
+            __import__(pkg)
+        except ImportError:
+            missing.append(pkg)
+    
+    if missing:
+        print(f"Missing dependencies: {', '.join(missing)}")
+        install = input("Would you like to install them now? (y/n): ")
+        if install.lower() == 'y':
+            subprocess.check_call([sys.executable, "-m", "pip", "install"] + missing)
+            print("Dependencies installed.")
+        else:
+            print("Please install the dependencies manually and try again.")
+            sys.exit(1)
+
+def run_code(input_file):
+    if not os.path.exists(input_file):
+        print(f"Error: Input file '{input_file}' not found.")
+        sys.exit(1)
+        
+    print("Running the code with the provided input file...")
+    
+    # Expected execution order based on analysis
+    execution_order = $execution_order
+    
+    # Handle the input file
+    # Copy it to the working directory if needed
+    if not os.path.dirname(input_file) == os.getcwd():
+        shutil.copy(input_file, os.getcwd())
+        input_file = os.path.basename(input_file)
+    
+    # Execute the main command
+    try:
+        argv = [arg.replace("input_file", input_file) for arg in $run_argv]
+        if not argv:
+            print("Error: No run command was determined for this code.")
+            sys.exit(1)
+        print(f"Executing: {' '.join(argv)}")
+        subprocess.run(argv, check=True)
+        print("Execution completed successfully!")
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"Error executing the code: {e}")
+        sys.exit(1)
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python run.py <input_file>")
+        print("Input file format: " + $input_format)
+        sys.exit(1)
+        
+    input_file = sys.argv[1]
+    check_dependencies()
+    run_code(input_file)
+    
+if __name__ == "__main__":
+    main()
+""")
+
+# Files are extracted (and, without batching, analyzed) on worker threads;
+# this keeps their progress lines from interleaving
+_print_lock = threading.Lock()
+
+def _log(message):
+    """Print a progress line from any worker thread."""
+    with _print_lock:
+        print(message)
+
+# bs4, requests and tiktoken are imported on first use, so --help and
+# early errors don't pay for loading them
+
+@functools.lru_cache(maxsize=None)
+def _soup_tools():
+    """Return (BeautifulSoup, parser name, strainer) for extract_code_from_html."""
+    from bs4 import BeautifulSoup, SoupStrainer
+    
+    # Prefer the C-based lxml parser, falling back to the stdlib one
+    try:
+        import lxml  # noqa: F401
+        parser = 'lxml'
+    except ImportError:
+        parser = 'html.parser'
+    
+    # Only these tags are ever inspected, so nothing else is built into the soup
+    strainer = SoupStrainer(["code", "pre", "p", "div", "title"])
+    return BeautifulSoup, parser, strainer
+
+@functools.lru_cache(maxsize=None)
+def _token_encoding():
+    """The tiktoken encoding, or None to count whitespace-separated words instead."""
+    # Exact token counts for truncating prompt content, when available
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The encoding is downloaded on first use; work offline without it
+        return None
+
+def _truncate_tokens(text, max_tokens):
+    """Cut text after its first max_tokens tokens; return (text, whether it was cut)."""
+    encoding = _token_encoding()
+    if encoding is not None:
+        # Pages about tokenizers quote special tokens like <|endoftext|>;
+        # encode them as plain text instead of raising
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text, False
+        return encoding.decode(tokens[:max_tokens]), True
+    
+    # Minified code or base64 has few spaces, so words alone could let a huge
+    # blob through; also cap at ~4 characters per token
+    max_chars = max_tokens * _CHARS_PER_TOKEN
+    for i, match in enumerate(_WORD_RE.finditer(text)):
+        if i == max_tokens:
+            return text[:min(match.start(), max_chars)].rstrip(), True
+        if match.end() > max_chars:
+            return text[:max_chars].rstrip(), True
+    return text, False
+
+def _count_tokens(text):
+    """Token count of text, or a conservative estimate (~3 characters per token) without tiktoken."""
+    encoding = _token_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return -(-len(text) // 3)
+
+def _unique_names(names):
+    """names with _2, _3, ... added to repeats, so every name is distinct."""
+    used = set()
+    unique = []
+    for name in names:
+        candidate, n = name, 1
+        while candidate in used:
+            n += 1
+            candidate = f"{name}_{n}"
+        used.add(candidate)
+        unique.append(candidate)
+    return unique
+
+def _split_command(command):
+    """Split a shell-style command line into an argv list, without a shell."""
+    try:
+        return shlex.split(command)
+    except ValueError:
+        # Unbalanced quotes; fall back to plain whitespace splitting
+        return command.split()
+
+def _has_min_text(element, min_length):
+    """Whether element.get_text().strip() is at least min_length long, stopping as soon as it is."""
+    # Walk the same strings get_text() joins, tracking where the stripped text
+    # would start (first non-space) and end (last non-space seen so far)
+    offset = 0
+    start = None
+    for piece in element.strings:
+        content = piece.rstrip()
+        if content:
+            if start is None:
+                start = offset + len(piece) - len(piece.lstrip())
+            if offset + len(content) - start >= min_length:
+                return True
+        offset += len(piece)
+    return False
 
 class OllamaHTMLParser:
-    def __init__(self, model_name="codellama:7b-instruct", ollama_url="http://localhost:11434"):
+    def __init__(self, model_name="codellama:7b-instruct", ollama_url="http://localhost:11434", use_cache=True,
+                 parallel=1):
         """
         Initialize the parser with a specific Ollama model.
         
         Args:
             model_name: The name of the Ollama model to use
             ollama_url: The URL of the Ollama server
+            use_cache: Whether to reuse analyses cached on disk from earlier runs
+            parallel: How many unbatched requests to have in flight at once
         """
         self.model_name = model_name
         self.ollama_url = ollama_url
         self.api_endpoint = f"{ollama_url}/api/generate"
+        self.use_cache = use_cache
+        self.cache_dir = pathlib.Path(_CACHE_DIR).expanduser()
+        self.parallel = max(1, parallel)
+        self._availability = None
+        
+        # One keep-alive session for every call to the Ollama server
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(4, self.parallel), max_retries=1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
         
     def _check_ollama_availability(self):
-        """Check if Ollama server is accessible and the model is available."""
+        """Check if Ollama server is accessible and the model is available (once per parser)."""
+        if self._availability is None:
+            self._availability = self._query_ollama_availability()
+        return self._availability
+    
+    def _query_ollama_availability(self):
+        """Ask the Ollama server whether it is up and has the model."""
+        import requests
+        
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags")
+            response = self.session.get(f"{self.ollama_url}/api/tags")
             if response.status_code != 200:
                 return False, "Ollama server is not responding correctly"
                 
-            models = response.json().get("models", [])
-            available_models = [model["name"] for model in models]
+            models = _loads(response.content).get("models", [])
+            available_models = {model["name"] for model in models}
             
             if self.model_name not in available_models:
-                return False, f"Model '{self.model_name}' is not available. Available models: {', '.join(available_models)}"
+                return False, f"Model '{self.model_name}' is not available. Available models: {', '.join(sorted(available_models))}"
                 
             return True, "Ollama is available with the requested model"
         except requests.exceptions.ConnectionError:
@@ -51,54 +346,71 @@ class OllamaHTMLParser:
             dict: Contains extracted code files and instructions
         """
         try:
-            with open(html_file, 'r', encoding='utf-8') as file:
-                html_content = file.read()
-                
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Let the parser read straight from the file; binary mode lets it
+            # pick up the encoding from the document's meta tags
+            BeautifulSoup, parser, strainer = _soup_tools()
+            with open(html_file, 'rb') as file:
+                soup = BeautifulSoup(file, parser, parse_only=strainer)
+            
+            # Walk the tree once, splitting code blocks from candidate instruction blocks
+            code_elements = []
+            text_elements = []
+            for element in soup.find_all(['code', 'pre', 'p', 'div']):
+                if element.name in ('code', 'pre'):
+                    code_elements.append(element)
+                else:
+                    text_elements.append(element)
+            
+            # Mark every element that has a code block somewhere below it; stop
+            # climbing once we reach an ancestor that is already marked
+            contains_code = set()
+            for code_element in code_elements:
+                for parent in code_element.parents:
+                    if id(parent) in contains_code:
+                        break
+                    contains_code.add(id(parent))
             
             # Extract all code blocks
             code_blocks = {}
-            for code_element in soup.find_all(['code', 'pre']):
+            for code_element in code_elements:
                 # Try to determine the language from class attributes or parent elements
                 language = "text"  # Default
                 class_attr = code_element.get('class', [])
                 
                 for cls in class_attr:
-                    if cls.startswith('language-') or cls.startswith('lang-'):
-                        language = cls.split('-')[1]
+                    lang_match = _LANG_CLASS_RE.match(cls)
+                    if lang_match:
+                        language = lang_match.group(1)
                         break
                 
                 # Try to find a filename comment or hint
                 code_text = code_element.get_text()
-                filename_match = re.search(r'filename[:\s]+([^\s]+)', code_text, re.IGNORECASE)
+                filename_match = _FILENAME_RE.search(code_text)
                 
+                # The hint comes from the page, so keep only a plain name that
+                # cannot point outside the output directory
+                filename = None
                 if filename_match:
-                    filename = filename_match.group(1)
-                else:
+                    filename = _SAFE_NAME_RE.sub('_', os.path.basename(filename_match.group(1)))
+                    if not filename or filename.startswith('.'):
+                        filename = None
+                if filename is None:
                     # Generate a filename based on content and language
-                    if language in ["python", "py"]:
-                        extension = "py"
-                    elif language in ["javascript", "js"]:
-                        extension = "js"
-                    elif language in ["html"]:
-                        extension = "html"
-                    elif language in ["css"]:
-                        extension = "css"
-                    elif language in ["shell", "bash", "sh"]:
-                        extension = "sh"
-                    else:
-                        extension = "txt"
-                        
+                    extension = _EXTENSIONS.get(language, "txt")
                     filename = f"extracted_{len(code_blocks) + 1}.{extension}"
                 
                 code_blocks[filename] = code_text
             
             # Extract instructions (assuming they're in paragraphs or divs)
             instructions = []
-            for para in soup.find_all(['p', 'div']):
-                if para.find(['code', 'pre']) is None:  # Skip if it contains code
+            for para in text_elements:
+                if id(para) not in contains_code:  # Skip if it contains code
+                    # Assuming instructions are reasonably long; only build the
+                    # full text once the element is known to clear the bar
+                    if not _has_min_text(para, 21):
+                        continue
                     text = para.get_text().strip()
-                    if text and len(text) > 20:  # Assuming instructions are reasonably long
+                    if len(text) > 20:
                         instructions.append(text)
             
             return {
@@ -108,171 +420,262 @@ class OllamaHTMLParser:
             }
             
         except Exception as e:
-            print(f"Error parsing HTML: {e}")
+            _log(f"Error parsing HTML: {e}")
             return {"error": str(e)}
     
-    def analyze_with_ollama(self, extracted_data):
+    @staticmethod
+    def _describe_document(extracted_data):
+        """Render the instructions and (up to 3) code files of one document for a prompt."""
+        # Truncate on token boundaries, so the same content always renders
+        # to the same prompt text
+        instructions, _ = _truncate_tokens(
+            " ".join(extracted_data.get("instructions", ["No instructions provided."])), _INSTRUCTION_TOKENS)
+        parts = [f"""INSTRUCTIONS:
+{instructions}
+
+CODE FILES:
+"""]
+        # Add up to 3 code files to the prompt (to avoid token limits)
+        for i, (filename, code) in enumerate(extracted_data.get("code_files", {}).items()):
+            if i >= 3:
+                parts.append("\n[Additional code files omitted for brevity]")
+                break
+            code, truncated = _truncate_tokens(code, _CODE_FILE_TOKENS)
+            parts.append(f"\n--- {filename} ---\n{code}")
+            if truncated:
+                parts.append("\n[Code truncated...]")
+        return "".join(parts)
+    
+    def _cache_path(self, extracted_data):
+        """Path of the cached analysis for a document."""
+        content = self.model_name + _PROMPT_KEY + self._describe_document(extracted_data)
+        key = hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+        return self.cache_dir / f"{key}.json"
+    
+    def _load_cached(self, extracted_data):
+        """Return the cached analysis for a document, or None on a miss."""
+        if not self.use_cache:
+            return None
+        cache_path = self._cache_path(extracted_data)
+        try:
+            return _loads(cache_path.read_bytes())
+        except (OSError, ValueError):
+            return None
+    
+    def _store_cached(self, extracted_data, analysis):
+        """Cache a successful analysis for a document."""
+        if not self.use_cache or "error" in analysis:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._cache_path(extracted_data).write_text(json.dumps(analysis))
+        except OSError as e:
+            print(f"Could not write analysis cache: {e}")
+    
+    def _generate(self, system, prompt, closing, parse):
+        """
+        Stream a completion from Ollama.
+        
+        Args:
+            system: The invariant system prompt
+            prompt: The per-call prompt
+            closing: Character that may end the expected JSON value
+            parse: Function turning the text generated so far into a result, or None
+            
+        Returns:
+            tuple: (parsed result or None, generated text)
+        """
+        response = self.session.post(
+            self.api_endpoint,
+            json={
+                "model": self.model_name,
+                "system": system,
+                "prompt": prompt,
+                "stream": True,
+                "keep_alive": _KEEP_ALIVE,
+                "options": {"num_ctx": _NUM_CTX}
+            },
+            headers={"Accept": "application/x-ndjson"},
+            stream=True
+        )
+        
+        with response:
+            if response.status_code != 200:
+                raise RuntimeError(f"Ollama API error: {response.text}")
+            
+            # Accumulate tokens as they arrive and stop as soon as the
+            # complete JSON value has been generated
+            tokens = []
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = _loads(line)
+                token = chunk.get("response", "")
+                tokens.append(token)
+                if closing in token:
+                    generated_text = "".join(tokens)
+                    result = parse(generated_text)
+                    if result is not None:
+                        return result, generated_text
+                if chunk.get("done"):
+                    break
+        
+        generated_text = "".join(tokens)
+        return parse(generated_text), generated_text
+    
+    def analyze_with_ollama(self, extracted_data, check_availability=True):
         """
         Use Ollama to analyze the extracted code and instructions.
         
         Args:
             extracted_data: Dictionary containing code files and instructions
+            check_availability: Whether to check the server and model first
             
         Returns:
             dict: Analysis results from the model
         """
-        ollama_available, message = self._check_ollama_availability()
-        if not ollama_available:
-            return {"error": message}
+        cached = self._load_cached(extracted_data)
+        if cached is not None:
+            return cached
         
-        # Prepare the prompt for Ollama
-        prompt = f"""Analyze the following code files and instructions:
-
-INSTRUCTIONS:
-{" ".join(extracted_data.get("instructions", ["No instructions provided."]))[:5000]}
-
-CODE FILES:
-"""
-        # Add up to 3 code files to the prompt (to avoid token limits)
-        for i, (filename, code) in enumerate(extracted_data.get("code_files", {}).items()):
-            if i >= 3:
-                prompt += "\n[Additional code files omitted for brevity]"
-                break
-            prompt += f"\n--- {filename} ---\n{code[:2000]}"
-            if len(code) > 2000:
-                prompt += "\n[Code truncated...]"
+        if check_availability:
+            ollama_available, message = self._check_ollama_availability()
+            if not ollama_available:
+                return {"error": message}
         
-        prompt += """
-
-Please provide the following information in JSON format:
-1. The main purpose of the code
-2. The proper order to run the files
-3. Required dependencies
-4. Command to run the code with an input file
-5. Expected input file format
-6. Expected output
-
-The JSON format should be:
-{
-    "purpose": "Brief description of what the code does",
-    "execution_order": ["file1.py", "file2.py", ...],
-    "dependencies": ["package1", "package2", ...],
-    "run_command": "python main.py input_file",
-    "input_format": "Description of the expected input format",
-    "output_description": "Description of the expected output"
-}
-"""
+        # Prepare the prompt for Ollama
+        prompt = ("Analyze the following code files and instructions:\n\n"
+                  + self._describe_document(extracted_data) + _PROMPT_SUFFIX)
         
         try:
-            response = requests.post(
-                self.api_endpoint,
-                json={
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": False
-                }
-            )
-            
-            if response.status_code != 200:
-                return {"error": f"Ollama API error: {response.text}"}
-                
-            generated_text = response.json().get("response", "")
-            
-            # Extract JSON from the response
-            json_pattern = r'\{[\s\S]*\}'
-            json_match = re.search(json_pattern, generated_text)
-            
-            if json_match:
-                try:
-                    analysis = json.loads(json_match.group(0))
-                    return analysis
-                except json.JSONDecodeError:
-                    return {"error": "Could not parse the model's JSON output", "raw_output": generated_text}
-            else:
-                return {"error": "Could not find JSON in the model's output", "raw_output": generated_text}
-                
+            analysis, generated_text = self._generate(_SYSTEM_PROMPT, prompt, "}", self._parse_json_blob)
         except Exception as e:
             return {"error": f"Error communicating with Ollama: {e}"}
+        
+        if analysis is not None:
+            self._store_cached(extracted_data, analysis)
+            return analysis
+        if _JSON_BLOB_RE.search(generated_text):
+            return {"error": "Could not parse the model's JSON output", "raw_output": generated_text}
+        return {"error": "Could not find JSON in the model's output", "raw_output": generated_text}
     
-    def create_runner_script(self, analysis, code_directory):
+    def analyze_batch_with_ollama(self, documents):
         """
-        Create a runner script based on the analysis to easily execute the code.
+        Analyze several extracted documents with a single Ollama call.
+        
+        Documents with a cached analysis are not sent. The rest fall back to
+        one call per document when only one is left, when the combined prompt
+        would not fit in the context window, or when the model does not return
+        one analysis per document.
         
         Args:
-            analysis: The analysis results from Ollama
-            code_directory: Directory where the code files are stored
+            documents: List of dictionaries returned by extract_code_from_html
             
         Returns:
-            str: Path to the runner script
+            list: One analysis dictionary per document, in the same order
         """
-        runner_script = os.path.join(code_directory, "run.py")
+        results = [self._load_cached(doc) for doc in documents]
+        pending = [i for i, analysis in enumerate(results) if analysis is None]
+        if not pending:
+            return results
         
-        template = f"""#!/usr/bin/env python3
-# Auto-generated runner script for {analysis.get("purpose", "extracted code")}
-import os
-import sys
-import subprocess
-import shutil
-
-def check_dependencies():
-    required = {analysis.get("dependencies", [])}
-    missing = []
+        ollama_available, message = self._check_ollama_availability()
+        if not ollama_available:
+            return [analysis if analysis is not None else {"error": message} for analysis in results]
+        
+        for i, analysis in zip(pending, self._analyze_uncached([documents[i] for i in pending])):
+            results[i] = analysis
+        return results
     
-    for pkg in required:
+    def _analyze_uncached(self, documents):
+        """Analyze documents with one batched call, falling back to one call each."""
+        def one_by_one():
+            if self.parallel == 1 or len(documents) < 2:
+                return [self.analyze_with_ollama(doc, check_availability=False) for doc in documents]
+            # Keep several requests in flight; Ollama serves up to
+            # OLLAMA_NUM_PARALLEL of them at once
+            with ThreadPoolExecutor(max_workers=min(self.parallel, len(documents))) as executor:
+                return list(executor.map(lambda doc: self.analyze_with_ollama(doc, check_availability=False),
+                                         documents))
+        
+        if len(documents) < 2:
+            return one_by_one()
+        
+        parts = [f"Analyze the following {len(documents)} documents and return exactly {len(documents)} objects.\n"]
+        for i, doc in enumerate(documents, 1):
+            parts.append(f"\n=== Doc {i} ===\n{self._describe_document(doc)}\n")
+        parts.append(_PROMPT_SUFFIX)
+        prompt = "".join(parts)
+        
+        # Ollama silently drops the start of an over-long prompt (the schema
+        # in the system prompt), so leave room for every answer too
+        needed = (_count_tokens(_BATCH_SYSTEM_PROMPT) + _count_tokens(prompt)
+                  + _ANSWER_TOKENS_PER_DOC * len(documents))
+        if needed > _NUM_CTX:
+            return one_by_one()
+        
+        def parse(text):
+            analyses = self._parse_json_array(text)
+            if analyses is not None and len(analyses) == len(documents):
+                return analyses
+            return None
+        
         try:
-            __import__(pkg)
-        except ImportError:
-            missing.append(pkg)
-    
-    if missing:
-        print(f"Missing dependencies: {{', '.join(missing)}}")
-        install = input("Would you like to install them now? (y/n): ")
-        if install.lower() == 'y':
-            subprocess.check_call([sys.executable, "-m", "pip", "install"] + missing)
-            print("Dependencies installed.")
-        else:
-            print("Please install the dependencies manually and try again.")
-            sys.exit(1)
-
-def run_code(input_file):
-    if not os.path.exists(input_file):
-        print(f"Error: Input file '{{input_file}}' not found.")
-        sys.exit(1)
+            analyses, _ = self._generate(_BATCH_SYSTEM_PROMPT, prompt, "]", parse)
+        except Exception:
+            analyses = None
         
-    print("Running the code with the provided input file...")
+        if analyses is None or not all(isinstance(a, dict) for a in analyses):
+            print("Batched analysis failed, analyzing documents one by one")
+            return one_by_one()
+        
+        for doc, analysis in zip(documents, analyses):
+            self._store_cached(doc, analysis)
+        return analyses
     
-    # Expected execution order based on analysis
-    execution_order = {analysis.get("execution_order", [])}
+    @staticmethod
+    def _parse_json_blob(text):
+        """Return the JSON object embedded in text, or None if it is not complete yet."""
+        json_match = _JSON_BLOB_RE.search(text)
+        if not json_match:
+            return None
+        try:
+            return _loads(json_match.group(0))
+        except json.JSONDecodeError:
+            return None
     
-    # Handle the input file
-    # Copy it to the working directory if needed
-    if not os.path.dirname(input_file) == os.getcwd():
-        shutil.copy(input_file, os.getcwd())
-        input_file = os.path.basename(input_file)
+    @staticmethod
+    def _parse_json_array(text):
+        """Return the JSON array embedded in text, or None if it is not complete yet."""
+        json_match = _JSON_ARRAY_RE.search(text)
+        if not json_match:
+            return None
+        try:
+            analyses = _loads(json_match.group(0))
+        except json.JSONDecodeError:
+            return None
+        return analyses if isinstance(analyses, list) else None
     
-    # Execute the main command
-    try:
-        cmd = "{analysis.get("run_command", "")}".replace("input_file", input_file)
-        print(f"Executing: {{cmd}}")
-        subprocess.run(cmd, shell=True, check=True)
-        print("Execution completed successfully!")
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing the code: {{e}}")
-        sys.exit(1)
-
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: python run.py <input_file>")
-        print("Input file format: {analysis.get("input_format", "Not specified")}")
-        sys.exit(1)
+    def create_runner_script(self, analysis, code_directory):
+        """
+        Create a runner script based on the analysis to easily execute the code.
         
-    input_file = sys.argv[1]
-    check_dependencies()
-    run_code(input_file)
-    
-if __name__ == "__main__":
-    main()
-"""
+        Args:
+            analysis: The analysis results from Ollama
+            code_directory: Directory where the code files are stored
+            
+        Returns:
+            str: Path to the runner script
+        """
+        runner_script = os.path.join(code_directory, "run.py")
+        
+        template = _RUNNER_TEMPLATE.substitute(
+            purpose=" ".join(str(analysis.get("purpose", "extracted code")).split()),
+            dependencies=repr(analysis.get("dependencies", [])),
+            execution_order=repr(analysis.get("execution_order", [])),
+            run_argv=repr(_split_command(str(analysis.get("run_command", "")))),
+            input_format=repr(str(analysis.get("input_format", "Not specified"))),
+        )
         
         with open(runner_script, 'w') as f:
             f.write(template)
@@ -280,83 +683,124 @@ if __name__ == "__main__":
         os.chmod(runner_script, 0o755)  # Make it executable
         return runner_script
 
+def save_extracted(extracted_data, output_dir):
+    """Write the extracted code files and instructions to output_dir."""
+    for filename, code in extracted_data.get("code_files", {}).items():
+        # Filenames are plain names, so output_dir is the only directory needed
+        file_path = os.path.join(output_dir, filename)
+        with open(file_path, 'w', buffering=1 << 16, encoding='utf-8') as f:
+            f.write(code)
+        
+        _log(f"Saved: {file_path}")
+    
+    # Save instructions
+    if extracted_data.get("instructions"):
+        with open(os.path.join(output_dir, "instructions.txt"), 'w', buffering=1 << 16, encoding='utf-8') as f:
+            f.write("\n\n".join(extracted_data["instructions"]))
+        _log(f"Saved: {os.path.join(output_dir, 'instructions.txt')}")
+
+def report_analysis(parser, extracted_data, analysis, output_dir):
+    """Write the README and runner script for one analysis; return False on error."""
+    if "error" in analysis:
+        print(f"Analysis error: {analysis['error']}")
+        if "raw_output" in analysis:
+            print("\nRaw output from model:")
+            print(analysis["raw_output"][:500] + "..." if len(analysis["raw_output"]) > 500 else analysis["raw_output"])
+        return False
+    
+    # Create a README with the analysis
+    with open(os.path.join(output_dir, "README.md"), 'w') as f:
+        f.write(f"# {extracted_data.get('title', 'Extracted Code')}\n\n")
+        f.write(f"## Purpose\n{analysis.get('purpose', 'Not specified')}\n\n")
+        f.write(f"## Dependencies\n")
+        for dep in analysis.get("dependencies", []):
+            f.write(f"- {dep}\n")
+        f.write(f"\n## How to Run\n```\n{analysis.get('run_command', 'Command not specified')}\n```\n\n")
+        f.write(f"## Input Format\n{analysis.get('input_format', 'Not specified')}\n\n")
+        f.write(f"## Expected Output\n{analysis.get('output_description', 'Not specified')}\n\n")
+    
+    print(f"Saved: {os.path.join(output_dir, 'README.md')}")
+    
+    # Create the runner script
+    runner_script = parser.create_runner_script(analysis, output_dir)
+    print(f"Created runner script: {runner_script}")
+    
+    print("\nSummary of extraction:")
+    print(f"- Extracted {len(extracted_data.get('code_files', {}))} code files")
+    print(f"- Found {len(extracted_data.get('instructions', []))} instruction blocks")
+    print(f"- Generated README.md and run.py")
+    print(f"\nTo run the extracted code with an input file:")
+    print(f"cd {output_dir}")
+    print(f"python run.py path/to/your/input_file")
+    return True
+
 def main():
     parser = argparse.ArgumentParser(description="Parse HTML files with code using Ollama")
-    parser.add_argument("html_file", help="Path to the HTML file to parse")
+    parser.add_argument("html_files", nargs="+", metavar="html_file", help="Path(s) to the HTML file(s) to parse")
     parser.add_argument("--model", default="llama3", help="Ollama model to use (default: llama3)")
-    parser.add_argument("--output", help="Output directory for extracted code (default: auto-generated)")
+    parser.add_argument("--output", help="Output directory for extracted code (default: auto-generated; "
+                                         "one subdirectory per file when several are given)")
     parser.add_argument("--ollama-url", default="http://localhost:11434", help="Ollama API URL")
+    parser.add_argument("--parallel", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Files to extract, and unbatched requests to send, at once (default: min(4, CPUs))")
+    parser.add_argument("--no-cache", action="store_true", help=f"Ignore and do not write cached analyses in {_CACHE_DIR}")
     args = parser.parse_args()
     
-    if not os.path.exists(args.html_file):
-        print(f"Error: HTML file '{args.html_file}' not found.")
-        return 1
-        
-    # Create output directory
-    output_dir = args.output if args.output else f"extracted_code_{int(os.path.getmtime(args.html_file))}"
-    os.makedirs(output_dir, exist_ok=True)
+    for html_file in args.html_files:
+        if not os.path.exists(html_file):
+            print(f"Error: HTML file '{html_file}' not found.")
+            return 1
     
     print(f"Using Ollama model: {args.model}")
-    parser = OllamaHTMLParser(model_name=args.model, ollama_url=args.ollama_url)
+    parser = OllamaHTMLParser(model_name=args.model, ollama_url=args.ollama_url, use_cache=not args.no_cache,
+                              parallel=args.parallel)
     
-    print(f"Parsing HTML file: {args.html_file}")
-    extracted_data = parser.extract_code_from_html(args.html_file)
+    # Inputs sharing a stem (a/index.html, b/index.html) get distinct output
+    # directories, so their workers never write the same files
+    stems = _unique_names([os.path.splitext(os.path.basename(f))[0] for f in args.html_files])
     
-    if "error" in extracted_data:
-        print(f"Error: {extracted_data['error']}")
-        return 1
+    def process_one(html_file, stem):
+        """Extract and save one file; return its job tuple, or None on error."""
+        # Create output directory
+        if not args.output:
+            output_dir = f"extracted_code_{int(os.path.getmtime(html_file))}"
+            if len(args.html_files) > 1:
+                output_dir += f"_{stem}"
+        elif len(args.html_files) > 1:
+            output_dir = os.path.join(args.output, stem)
+        else:
+            output_dir = args.output
+        os.makedirs(output_dir, exist_ok=True)
         
-    # Save extracted code files
-    for filename, code in extracted_data.get("code_files", {}).items():
-        file_path = os.path.join(output_dir, filename)
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        _log(f"Parsing HTML file: {html_file}")
+        extracted_data = parser.extract_code_from_html(html_file)
         
-        with open(file_path, 'w') as f:
-            f.write(code)
+        if "error" in extracted_data:
+            _log(f"Error: {extracted_data['error']}")
+            return None
         
-        print(f"Saved: {file_path}")
+        save_extracted(extracted_data, output_dir)
+        return html_file, output_dir, extracted_data
     
-    # Save instructions
-    if extracted_data.get("instructions"):
-        with open(os.path.join(output_dir, "instructions.txt"), 'w') as f:
-            f.write("\n\n".join(extracted_data["instructions"]))
-        print(f"Saved: {os.path.join(output_dir, 'instructions.txt')}")
+    # Extract every file first so they can all be analyzed in one call
+    with ThreadPoolExecutor(max_workers=max(1, args.parallel)) as executor:
+        results = list(executor.map(process_one, args.html_files, stems))
+    jobs = [job for job in results if job is not None]
+    failed = len(jobs) < len(results)
+    
+    if not jobs:
+        return 1
     
     print(f"\nAnalyzing code with Ollama ({args.model})...")
-    analysis = parser.analyze_with_ollama(extracted_data)
+    analyses = parser.analyze_batch_with_ollama([extracted_data for _, _, extracted_data in jobs])
     
-    if "error" in analysis:
-        print(f"Analysis error: {analysis['error']}")
-        if "raw_output" in analysis:
-            print("\nRaw output from model:")
-            print(analysis["raw_output"][:500] + "..." if len(analysis["raw_output"]) > 500 else analysis["raw_output"])
-    else:
-        # Create a README with the analysis
-        with open(os.path.join(output_dir, "README.md"), 'w') as f:
-            f.write(f"# {extracted_data.get('title', 'Extracted Code')}\n\n")
-            f.write(f"## Purpose\n{analysis.get('purpose', 'Not specified')}\n\n")
-            f.write(f"## Dependencies\n")
-            for dep in analysis.get("dependencies", []):
-                f.write(f"- {dep}\n")
-            f.write(f"\n## How to Run\n```\n{analysis.get('run_command', 'Command not specified')}\n```\n\n")
-            f.write(f"## Input Format\n{analysis.get('input_format', 'Not specified')}\n\n")
-            f.write(f"## Expected Output\n{analysis.get('output_description', 'Not specified')}\n\n")
-        
-        print(f"Saved: {os.path.join(output_dir, 'README.md')}")
-        
-        # Create the runner script
-        runner_script = parser.create_runner_script(analysis, output_dir)
-        print(f"Created runner script: {runner_script}")
-        
-        print("\nSummary of extraction:")
-        print(f"- Extracted {len(extracted_data.get('code_files', {}))} code files")
-        print(f"- Found {len(extracted_data.get('instructions', []))} instruction blocks")
-        print(f"- Generated README.md and run.py")
-        print(f"\nTo run the extracted code with an input file:")
-        print(f"cd {output_dir}")
-        print(f"python run.py path/to/your/input_file")
-    
-    return 0
+    for (html_file, output_dir, extracted_data), analysis in zip(jobs, analyses):
+        if len(jobs) > 1:
+            print(f"\n== {html_file} ==")
+        if not report_analysis(parser, extracted_data, analysis, output_dir):
+            failed = True
+    
+    return 1 if failed else 0
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -1,16 +1,25 @@
+import re
+import sys
+from bisect import bisect_right
+from itertools import accumulate
 import streamlit as st
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-import torch
-from langchain_community.document_loaders import UnstructuredURLLoader
-from langchain_community.utilities import GoogleSerperAPIWrapper
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import warnings
 warnings.filterwarnings('ignore')
 
-# Check for GPU
-device = 0 if torch.cuda.is_available() else -1
-device_name = "GPU" if device == 0 else "CPU"
+# torch, transformers, langchain_community and bs4 are imported inside the
+# functions that need them, so the page (and plain Search) renders without
+# loading them
+
+# Optional: lexbor-based HTML parser, much faster than BeautifulSoup
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
 
 st.set_page_config(page_title="Last Week In...", page_icon="📰", layout="wide")
 
@@ -18,181 +27,472 @@ st.set_page_config(page_title="Last Week In...", page_icon="📰", layout="wide"
 # MODEL SELECTION & CACHING
 # ═══════════════════════════════════════════════════════════════════
 
+def pick_dtype(torch, device):
+    """BF16 (else FP16) on GPU, BF16 on CPUs with native BF16 support, FP32 otherwise."""
+    if device == 0:
+        return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    bf16_check = getattr(torch.cpu, "_is_avx512_bf16_supported", None)
+    if bf16_check is not None and bf16_check():
+        return torch.bfloat16
+    return torch.float32
+
+@st.cache_resource
+def torch_runtime():
+    """Import torch and pick the device and dtype; returns (torch, device, dtype)."""
+    import torch
+    
+    # Check for GPU
+    device = 0 if torch.cuda.is_available() else -1
+    
+    # INT8 is deliberately not used: its quantize/dequantize overhead tends
+    # to make these models slower, not faster
+    return torch, device, pick_dtype(torch, device)
+
+def device_label():
+    """Device and dtype in use, without importing torch just to show them."""
+    if "torch" not in sys.modules:
+        return "detected when a model loads"
+    torch, device, dtype = torch_runtime()
+    device_name = "GPU" if device == 0 else "CPU"
+    return f'{device_name} ({str(dtype).replace("torch.", "")})'
+
+def compile_model(model):
+    """Compile the model's forward pass with torch.compile, when available."""
+    torch, device, _ = torch_runtime()
+    if not hasattr(torch, "compile"):
+        return model
+    try:
+        # CUDA graphs ("reduce-overhead") only help on GPU
+        mode = "reduce-overhead" if device == 0 else "default"
+        model.forward = torch.compile(model.forward, mode=mode, fullgraph=False)
+    except Exception as e:
+        st.warning(f"torch.compile unavailable, running eagerly: {e}")
+    return model
+
+# T5-family (incl. FLAN-T5) and Pegasus activations overflow FP16 into NaN/garbage
+FP16_UNSAFE_MODELS = ("t5", "pegasus")
+
+def model_dtype(model_name):
+    """The runtime dtype for this model: FP32 instead of FP16 for models that overflow in it."""
+    torch, _, dtype = torch_runtime()
+    if dtype == torch.float16 and any(family in model_name.lower() for family in FP16_UNSAFE_MODELS):
+        return torch.float32
+    return dtype
+
+def attention_implementations(dtype):
+    """Fused attention backends to try, best first; None means the model default."""
+    torch, device, _ = torch_runtime()
+    candidates = []
+    if device == 0 and dtype in (torch.float16, torch.bfloat16):
+        try:
+            import flash_attn  # noqa: F401
+            candidates.append("flash_attention_2")
+        except ImportError:
+            pass
+    candidates.append("sdpa")
+    candidates.append(None)
+    return candidates
+
+def load_seq2seq_model(model_name):
+    """Load the model with the fastest attention backend it supports.
+
+    Flash-Attention 2 or SDPA when accepted, else BetterTransformer if optimum
+    is installed, else the model's default attention.
+    """
+    from transformers import AutoModelForSeq2SeqLM
+    
+    dtype = model_dtype(model_name)
+    for attn_implementation in attention_implementations(dtype):
+        kwargs = {"torch_dtype": dtype}
+        if attn_implementation is not None:
+            kwargs["attn_implementation"] = attn_implementation
+        try:
+            model = AutoModelForSeq2SeqLM.from_pretrained(model_name, **kwargs)
+        except (ValueError, TypeError, ImportError):
+            # Backend not supported by this model or transformers version
+            if attn_implementation is None:
+                raise
+            continue
+        if attn_implementation is None:
+            model = to_bettertransformer(model)
+        return model
+
+def to_bettertransformer(model):
+    """Swap in optimum's fused attention for models that could not use SDPA."""
+    try:
+        from optimum.bettertransformer import BetterTransformer
+        return BetterTransformer.transform(model, keep_original_model=False)
+    except Exception:
+        # optimum not installed, or no BetterTransformer support for this model
+        return model
+
+def build_summarizer(model_name, **pipeline_kwargs):
+    """Load tokenizer and model explicitly so the model can be compiled."""
+    from transformers import pipeline, AutoTokenizer
+    
+    torch, device, _ = torch_runtime()
+    dtype = model_dtype(model_name)
+    # The Rust-backed fast tokenizer is also used to cut chunks by token count
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    model = load_seq2seq_model(model_name)
+    if device == -1 and dtype == torch.bfloat16:
+        # Optional: Intel's CPU kernels for BF16 inference
+        try:
+            import intel_extension_for_pytorch as ipex
+            model = ipex.optimize(model.eval(), dtype=torch.bfloat16)
+        except ImportError:
+            pass
+    model = compile_model(model)
+    return pipeline(
+        "summarization",
+        model=model,
+        tokenizer=tokenizer,
+        device=device,
+        max_length=150,
+        min_length=50,
+        # Greedy decoding by default; callers can ask for beams per call
+        num_beams=1,
+        do_sample=False,
+        early_stopping=True,
+        **pipeline_kwargs
+    )
+
+def warm_up(summarizer):
+    """Run dummy summaries so the one-off compile cost is paid at load time."""
+    _, device, _ = torch_runtime()
+    generation_config = summarizer.model.generation_config
+    runs = 1
+    if device == 0:
+        # A preallocated KV cache keeps decode shapes fixed, so the compiled
+        # forward can be replayed as a CUDA graph; the first run compiles,
+        # the second captures the graph
+        generation_config.cache_implementation = "static"
+        runs = 2
+    try:
+        for _ in range(runs):
+            summarizer("warmup " * 200)
+    except Exception as e:
+        if generation_config.cache_implementation != "static":
+            st.warning(f"Model warmup failed: {e}")
+            return
+        # This model or transformers version has no static cache; use the
+        # dynamic one
+        generation_config.cache_implementation = None
+        try:
+            summarizer("warmup " * 200)
+        except Exception as e:
+            st.warning(f"Model warmup failed: {e}")
+
 @st.cache_resource
 def load_summarization_model(model_name):
-    """Load and cache the summarization model."""
+    """Load, compile, warm up and cache the summarization model."""
     try:
         if model_name == "facebook/bart-large-cnn":
             # BART - Great for news summarization (400MB)
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-            summarizer = pipeline(
-                "summarization",
-                model=model,
-                tokenizer=tokenizer,
-                device=device,
-                max_length=150,
-                min_length=50,
-                do_sample=False
-            )
+            summarizer = build_summarizer(model_name)
         elif model_name == "google/pegasus-xsum":
             # Pegasus - Excellent for abstractive summarization (568MB)
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-            summarizer = pipeline(
-                "summarization",
-                model=model,
-                tokenizer=tokenizer,
-                device=device,
-                max_length=150,
-                min_length=50
-            )
+            summarizer = build_summarizer(model_name)
         elif model_name == "sshleifer/distilbart-cnn-12-6":
             # DistilBART - Faster, smaller (306MB)
-            summarizer = pipeline(
-                "summarization",
-                model=model_name,
-                device=device,
-                max_length=150,
-                min_length=50
-            )
+            summarizer = build_summarizer(model_name)
         elif model_name == "facebook/mbart-large-50":
             # mBART - Multilingual support (2.4GB)
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-            summarizer = pipeline(
-                "summarization",
-                model=model,
-                tokenizer=tokenizer,
-                device=device,
-                max_length=150,
-                min_length=50
-            )
+            summarizer = build_summarizer(model_name)
         elif model_name == "philschmid/flan-t5-base-samsum":
             # FLAN-T5 - Instruction-tuned (250MB)
-            summarizer = pipeline(
-                "summarization",
-                model=model_name,
-                device=device,
-                max_length=150,
-                min_length=50
-            )
+            summarizer = build_summarizer(model_name)
         else:
             # Default to DistilBART
-            summarizer = pipeline(
-                "summarization",
-                model="sshleifer/distilbart-cnn-12-6",
-                device=device,
-                max_length=150,
-                min_length=50
-            )
+            summarizer = build_summarizer("sshleifer/distilbart-cnn-12-6")
+        
+        warm_up(summarizer)
         return summarizer
     except Exception as e:
         st.error(f"Error loading model: {e}")
         return None
 
-def chunk_text(text, max_length=1024):
-    """Split text into chunks that fit model's context window."""
-    words = text.split()
-    chunks = []
-    current_chunk = []
-    current_length = 0
+def chunk_text_by_tokens(text, tokenizer):
+    """Split text into windows of the model's own tokens that fit its context."""
+    # Some tokenizers report a huge sentinel instead of a real limit
+    window = min(tokenizer.model_max_length, 1024) - 2  # Room for special tokens
+    ids = tokenizer(text, add_special_tokens=False)['input_ids']
+    return [
+        tokenizer.decode(ids[start:start + window], skip_special_tokens=True)
+        for start in range(0, len(ids), window)
+    ]
+
+def tokenizer_family(tokenizer):
+    """Key under which tokenizers that cut text identically share chunks."""
+    # BART and DistilBART use the same tokenizer class, vocabulary and limit
+    return (type(tokenizer).__name__, tokenizer.vocab_size, tokenizer.model_max_length)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_token_chunks(text, family, _tokenizer):
+    """Token chunks of text, computed once per text and tokenizer family."""
+    return chunk_text_by_tokens(text, _tokenizer)
+
+def chunk_text(text, max_length=1024, tokenizer=None):
+    """Split text into chunks that fit model's context window.
+
+    With a tokenizer, chunks are cut by token count; otherwise by characters.
+    """
+    if tokenizer is not None:
+        return cached_token_chunks(text, tokenizer_family(tokenizer), tokenizer)
     
-    for word in words:
-        current_length += len(word) + 1
-        if current_length > max_length:
-            chunks.append(' '.join(current_chunk))
-            current_chunk = [word]
-            current_length = len(word)
-        else:
-            current_chunk.append(word)
+    words = text.split()
+    # offsets[k] is the length of the first k words with a space after each,
+    # so each chunk boundary is a single bisect instead of a per-word loop
+    offsets = [0]
+    offsets.extend(accumulate(len(word) + 1 for word in words))
     
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
+    chunks = []
+    start = 0
+    while start < len(words):
+        # A chunk after the first doesn't count the space before its first word
+        limit = offsets[start] + max_length + (1 if start else 0)
+        end = max(bisect_right(offsets, limit) - 1, start + 1)
+        chunks.append(' '.join(words[start:end]))
+        start = end
     
     return chunks
 
-def summarize_text(text, summarizer, model_name):
-    """Summarize text, handling long documents."""
-    try:
+# Chunks sent to the model per article, and most inputs per generate() batch
+MAX_CHUNKS_PER_ARTICLE = 3
+MAX_BATCH_SIZE = 16
+
+# Combined chunk summaries longer than this (in words) get a second,
+# summary-of-summaries pass when the extra pass is enabled
+SECOND_PASS_MIN_WORDS = 350
+
+def combine_summaries(summaries, summarizer, extra_pass=False, num_beams=1):
+    """Merge per-chunk summaries into one, optionally re-summarizing if they run long."""
+    if not summaries:
+        return "Could not generate summary."
+    # If multiple chunks, combine summaries
+    if len(summaries) > 1:
+        combined = " ".join(summaries)
+        # Summarize again if too long
+        if extra_pass and len(combined.split()) > SECOND_PASS_MIN_WORDS:
+            final = summarizer(combined, max_length=150, min_length=50, num_beams=num_beams)
+            return final[0]['summary_text']
+        return combined
+    return summaries[0]
+
+def summarize_texts(texts, summarizer, model_name, extra_pass=False, num_beams=1):
+    """Summarize several texts, batching all of their chunks through the model together."""
+    results = [None] * len(texts)
+    tokenizer = getattr(summarizer, "tokenizer", None)
+    inputs = []
+    owners = []
+    for idx, text in enumerate(texts):
         # Clean text
         text = text.strip()
         if len(text) < 100:
-            return "Text too short to summarize."
+            results[idx] = "Text too short to summarize."
+            continue
         
-        # Chunk if necessary
-        chunks = chunk_text(text, max_length=1024)
-        
-        summaries = []
-        for chunk in chunks[:3]:  # Limit to first 3 chunks to avoid timeout
+        # Chunk if necessary; limit to the first few chunks to avoid timeout
+        for chunk in chunk_text(text, max_length=1024, tokenizer=tokenizer)[:MAX_CHUNKS_PER_ARTICLE]:
+            if model_name == "philschmid/flan-t5-base-samsum":
+                # FLAN-T5 works better with instruction
+                chunk = f"Summarize this article: {chunk}"
+            inputs.append(chunk)
+            owners.append(idx)
+    
+    summaries = [[] for _ in texts]
+    generate_kwargs = dict(truncation=True, max_length=150, min_length=50, num_beams=num_beams)
+    if inputs:
+        try:
+            outputs = summarizer(inputs, batch_size=min(len(inputs), MAX_BATCH_SIZE), **generate_kwargs)
+            for idx, output in zip(owners, outputs):
+                summaries[idx].append(output['summary_text'])
+        except Exception as e:
+            # Retry one chunk at a time so a bad chunk only costs its own article
+            st.warning(f"Batched summarization failed, retrying chunk by chunk: {e}")
+            for idx, chunk in zip(owners, inputs):
+                try:
+                    summaries[idx].append(summarizer(chunk, **generate_kwargs)[0]['summary_text'])
+                except Exception as e:
+                    st.warning(f"Chunk summarization failed: {e}")
+    
+    for idx in range(len(texts)):
+        if results[idx] is None:
             try:
-                if model_name == "philschmid/flan-t5-base-samsum":
-                    # FLAN-T5 works better with instruction
-                    result = summarizer(f"Summarize this article: {chunk}", max_length=150, min_length=50)
-                else:
-                    result = summarizer(chunk, max_length=150, min_length=50)
-                
-                if result and len(result) > 0:
-                    summaries.append(result[0]['summary_text'])
+                results[idx] = combine_summaries(summaries[idx], summarizer, extra_pass, num_beams)
             except Exception as e:
-                st.warning(f"Chunk summarization failed: {e}")
-                continue
-        
-        if summaries:
-            # If multiple chunks, combine summaries
-            if len(summaries) > 1:
-                combined = " ".join(summaries)
-                # Summarize again if too long
-                if len(combined.split()) > 200:
-                    final = summarizer(combined, max_length=150, min_length=50)
-                    return final[0]['summary_text']
-                return combined
-            return summaries[0]
-        else:
-            return "Could not generate summary."
-    except Exception as e:
-        return f"Summarization error: {str(e)}"
+                results[idx] = f"Summarization error: {str(e)}"
+    return results
 
-def scrape_article_content(url):
-    """Scrape article content from URL using BeautifulSoup."""
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_5_1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10, verify=False)
-        soup = BeautifulSoup(response.content, 'html.parser')
+def summarize_text(text, summarizer, model_name, extra_pass=False, num_beams=1):
+    """Summarize text, handling long documents."""
+    return summarize_texts([text], summarizer, model_name, extra_pass, num_beams)[0]
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_5_1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36"
+
+# Candidate containers for the article body, most specific first
+ARTICLE_SELECTORS = ['article', 'main', 'div[class*="content"]', 'div[class*="article"]']
+NON_CONTENT_TAGS = ["script", "style", "nav", "footer", "header"]
+WHITESPACE_RE = re.compile(r'\s+')
+
+def extract_article_text(html):
+    """Return the visible text of the page's main article container."""
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
         
         # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.decompose()
+        for node in tree.css(", ".join(NON_CONTENT_TAGS)):
+            node.decompose()
         
         # Try to find article content
         article = None
-        for tag in ['article', 'main', 'div[class*="content"]', 'div[class*="article"]']:
-            article = soup.find(tag)
+        for selector in ARTICLE_SELECTORS:
+            article = tree.css_first(selector)
             if article:
                 break
         
         if not article:
-            article = soup.find('body')
-        
-        # Get text
-        text = article.get_text(separator=' ', strip=True) if article else ""
+            article = tree.body
         
-        # Clean up whitespace
-        text = ' '.join(text.split())
-        
-        return text[:5000]  # Limit to first 5000 chars
+        return article.text(separator=' ', strip=True) if article else ""
+    
+    from bs4 import BeautifulSoup
+    
+    # Prefer lxml under BeautifulSoup over the pure-Python parser
+    try:
+        import lxml  # noqa: F401
+        parser = 'lxml'
+    except ImportError:
+        parser = 'html.parser'
+    
+    soup = BeautifulSoup(html, parser)
+    
+    # Remove script and style elements
+    for script in soup(NON_CONTENT_TAGS):
+        script.decompose()
+    
+    # Try to find article content
+    article = None
+    for selector in ARTICLE_SELECTORS:
+        article = soup.select_one(selector)
+        if article:
+            break
+    
+    if not article:
+        article = soup.find('body')
+    
+    return article.get_text(separator=' ', strip=True) if article else ""
+
+@st.cache_resource
+def http_session():
+    """One pooled keep-alive session shared by every scrape, across reruns."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=1, backoff_factor=0.2)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+# Scraped pages are reused for an hour across reruns
+CACHE_TTL = 3600
+
+# Most HTML read from a page; only its first 5000 chars of text are kept
+MAX_HTML_BYTES = 512 * 1024
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_article_text(url):
+    """Download and extract article text; raises on failure so errors are not cached."""
+    with http_session().get(url, timeout=10, stream=True) as response:
+        # Media, PDFs and other non-HTML responses have no article to extract
+        content_type = response.headers.get("Content-Type", "text/html")
+        if "html" not in content_type.lower():
+            return ""
+        # The article text sits well within the first part of the page
+        html = response.raw.read(MAX_HTML_BYTES, decode_content=True)
+    text = extract_article_text(html)
+    
+    # Clean up whitespace in one C-level pass before cutting, so indentation
+    # and newlines don't eat into the 5000 chars kept (the HTML read is
+    # already capped at MAX_HTML_BYTES)
+    text = WHITESPACE_RE.sub(' ', text).strip()
+    
+    return text[:5000]  # Limit to first 5000 chars
+
+def scrape_article_content(url):
+    """Scrape article content from URL (selectolax, or BeautifulSoup as fallback)."""
+    try:
+        return fetch_article_text(url)
     except Exception as e:
         st.warning(f"Scraping failed: {e}")
         return ""
 
+def load_article(url, use_langchain=False):
+    """Load article text, optionally via LangChain's loader with scraping as fallback."""
+    if use_langchain:
+        try:
+            from langchain_community.document_loaders import UnstructuredURLLoader
+            loader = UnstructuredURLLoader(
+                urls=[url],
+                ssl_verify=False,
+                headers={"User-Agent": USER_AGENT}
+            )
+            data = loader.load()
+            return data[0].page_content if data else ""
+        except:
+            pass
+    return scrape_article_content(url)
+
+# News moves quickly, so search results are kept for less time than pages
+SEARCH_TTL = 600
+
+@st.cache_resource(show_spinner=False)
+def serper_client(api_key, tbs="qdr:w1"):
+    """One Serper news client per API key and time range, shared by all buttons."""
+    from langchain_community.utilities import GoogleSerperAPIWrapper
+    
+    return GoogleSerperAPIWrapper(
+        type="news",
+        tbs=tbs,
+        serper_api_key=api_key
+    )
+
+@st.cache_data(ttl=SEARCH_TTL, show_spinner=False)
+def search_news(query, api_key, tbs="qdr:w1"):
+    """Run a Serper news search (over the last week by default)."""
+    return serper_client(api_key, tbs).results(query)
+
+@st.cache_data(show_spinner=False)
+def cached_summary(text, model_name, extra_pass=False, num_beams=1):
+    """Summarize text with the named model, reusing earlier summaries of the same text."""
+    summarizer = load_summarization_model(model_name)
+    if summarizer is None:
+        # Raised rather than returned, so st.cache_data doesn't keep the failure
+        raise RuntimeError("Could not generate summary.")
+    return summarize_text(text, summarizer, model_name, extra_pass, num_beams)
+
+def summary_or_error(text, model_name, extra_pass=False, num_beams=1):
+    """cached_summary, or its error message to show in its place."""
+    try:
+        return cached_summary(text, model_name, extra_pass, num_beams)
+    except RuntimeError as e:
+        return str(e)
+
+def script_thread_pool(max_workers):
+    """A thread pool whose threads may call st.* functions for the current run."""
+    ctx = get_script_run_ctx()
+    return ThreadPoolExecutor(max_workers=max(1, max_workers),
+                              initializer=add_script_run_ctx, initargs=(None, ctx))
+
 # ═══════════════════════════════════════════════════════════════════
 # STREAMLIT UI
 # ═══════════════════════════════════════════════════════════════════
 
 st.title('📰 Last Week In...')
-st.caption(f'🖥️ Running on: **{device_name}** | 🤖 Powered by Open Source Transformers')
+st.caption(f'🖥️ Running on: **{device_label()}** | 🤖 Powered by Open Source Transformers')
 
 # Sidebar configuration
 with st.sidebar:
@@ -217,7 +517,7 @@ with st.sidebar:
     selected_model = model_options[selected_model_name]
     
     st.info(f"**Model:** {selected_model_name}\n\n"
-            f"**Device:** {device_name}\n\n"
+            f"**Device:** {device_label()}\n\n"
             f"⚡ First run will download model (~300-600MB)")
     
     st.divider()
@@ -245,6 +545,19 @@ with st.sidebar:
         help="Uses UnstructuredURLLoader (slower but more reliable)"
     )
     
+    extra_pass = st.checkbox(
+        "High-quality (extra pass)",
+        value=False,
+        help="Re-summarize long multi-part summaries into one (one more model call per article)"
+    )
+    
+    num_beams = st.select_slider(
+        "Quality",
+        options=[1, 2, 4],
+        value=1,
+        help="Beam search width: 1 is fastest (greedy), 4 is slowest but most thorough"
+    )
+    
     st.divider()
     
     st.caption("**Search:** Retrieves news articles")
@@ -271,12 +584,7 @@ if col1.button("🔍 Search", use_container_width=True):
         try:
             with st.spinner("🔎 Searching news..."):
                 # Search using Google Serper API
-                search = GoogleSerperAPIWrapper(
-                    type="news",
-                    tbs="qdr:w1",
-                    serper_api_key=serper_api_key
-                )
-                result_dict = search.results(search_query)
+                result_dict = search_news(search_query, serper_api_key)
 
                 if not result_dict.get('news'):
                     st.error(f"❌ No search results for: **{search_query}**")
@@ -309,59 +617,52 @@ if col2.button("✨ Search & Summarize", use_container_width=True):
                 st.error("❌ Failed to load summarization model.")
             else:
                 with st.spinner("🔎 Searching news..."):
-                    search = GoogleSerperAPIWrapper(
-                        type="news",
-                        tbs="qdr:w1",
-                        serper_api_key=serper_api_key
-                    )
-                    result_dict = search.results(search_query)
+                    result_dict = search_news(search_query, serper_api_key)
 
                     if not result_dict.get('news'):
                         st.error(f"❌ No search results for: **{search_query}**")
                     else:
                         st.success(f"✅ Found {len(result_dict['news'])} articles. Summarizing...")
                         
-                        progress_bar = st.progress(0)
+                        items = result_dict['news'][:num_results]
                         
-                        for i, item in enumerate(result_dict['news'][:num_results], 1):
-                            progress_bar.progress(i / num_results)
+                        # Start loading every article now; each one is awaited just before
+                        # it is summarized, so later downloads overlap earlier generation
+                        with script_thread_pool(len(items)) as executor:
+                            article_futures = [
+                                executor.submit(load_article, item['link'], use_langchain)
+                                for item in items
+                            ]
                             
-                            with st.expander(f"📄 {i}. {item['title']}", expanded=(i==1)):
-                                st.markdown(f"**🔗 Link:** [{item['link']}]({item['link']})")
-                                
-                                # Load content
-                                with st.spinner(f"Loading article {i}/{num_results}..."):
-                                    if use_langchain:
-                                        try:
-                                            loader = UnstructuredURLLoader(
-                                                urls=[item['link']],
-                                                ssl_verify=False,
-                                                headers={"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_5_1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36"}
-                                            )
-                                            data = loader.load()
-                                            article_text = data[0].page_content if data else ""
-                                        except:
-                                            article_text = scrape_article_content(item['link'])
-                                    else:
-                                        article_text = scrape_article_content(item['link'])
-                                
-                                if not article_text or len(article_text) < 100:
-                                    st.warning("⚠️ Could not extract article content. Using snippet instead.")
-                                    article_text = item['snippet']
-                                
-                                # Summarize
-                                with st.spinner("✨ Generating summary..."):
-                                    summary = summarize_text(article_text, summarizer, selected_model)
-                                
-                                # Display
-                                st.markdown("**🤖 AI Summary:**")
-                                st.info(summary)
-                                
-                                with st.expander("📋 Original snippet"):
-                                    st.write(item['snippet'])
+                            progress_bar = st.progress(0)
+                            
+                            for i, (item, article_future) in enumerate(zip(items, article_futures), 1):
+                                progress_bar.progress(i / len(items))
                                 
-                                if 'date' in item:
-                                    st.caption(f"📅 {item['date']}")
+                                with st.expander(f"📄 {i}. {item['title']}", expanded=(i==1)):
+                                    st.markdown(f"**🔗 Link:** [{item['link']}]({item['link']})")
+                                    
+                                    # Load content
+                                    with st.spinner(f"Loading article {i}/{len(items)}..."):
+                                        article_text = article_future.result()
+                                    
+                                    if not article_text or len(article_text) < 100:
+                                        st.warning("⚠️ Could not extract article content. Using snippet instead.")
+                                        article_text = item['snippet']
+                                    
+                                    # Summarize
+                                    with st.spinner("✨ Generating summary..."):
+                                        summary = summary_or_error(article_text, selected_model, extra_pass, num_beams)
+                                    
+                                    # Display
+                                    st.markdown("**🤖 AI Summary:**")
+                                    st.info(summary)
+                                    
+                                    with st.expander("📋 Original snippet"):
+                                        st.write(item['snippet'])
+                                    
+                                    if 'date' in item:
+                                        st.caption(f"📅 {item['date']}")
                         
                         progress_bar.progress(1.0)
                         st.balloons()
@@ -379,31 +680,11 @@ if col3.button("📊 Search & Compare All Models", use_container_width=True):
     else:
         try:
             with st.spinner("🔎 Searching news..."):
-                search = GoogleSerperAPIWrapper(
-                    type="news",
-                    tbs="qdr:w1",
-                    serper_api_key=serper_api_key
-                )
-                result_dict = search.results(search_query)
+                result_dict = search_news(search_query, serper_api_key)
 
                 if not result_dict.get('news'):
                     st.error(f"❌ No search results for: **{search_query}**")
                 else:
-                    # Get first article
-                    item = result_dict['news'][0]
-                    st.subheader(f"📄 {item['title']}")
-                    st.markdown(f"**🔗 Link:** [{item['link']}]({item['link']})")
-                    
-                    # Load content
-                    article_text = scrape_article_content(item['link'])
-                    
-                    if not article_text or len(article_text) < 100:
-                        st.warning("Using snippet for comparison")
-                        article_text = item['snippet']
-                    
-                    st.divider()
-                    st.subheader("🤖 Model Comparison")
-                    
                     # Test all models
                     models_to_test = [
                         ("DistilBART (Fast)", "sshleifer/distilbart-cnn-12-6"),
@@ -411,14 +692,40 @@ if col3.button("📊 Search & Compare All Models", use_container_width=True):
                         ("FLAN-T5 (Efficient)", "philschmid/flan-t5-base-samsum")
                     ]
                     
-                    for model_display, model_path in models_to_test:
-                        with st.spinner(f"Testing {model_display}..."):
-                            test_summarizer = load_summarization_model(model_path)
-                            if test_summarizer:
-                                summary = summarize_text(article_text, test_summarizer, model_path)
-                                
-                                with st.expander(f"✨ {model_display}", expanded=True):
-                                    st.info(summary)
+                    # Load (and warm up) the models in the background while
+                    # the article is scraped. One worker loads them one after
+                    # another: torch.compile and CUDA graph capture must not
+                    # run concurrently, and only one model loads into memory
+                    # at a time
+                    with script_thread_pool(1) as executor:
+                        model_futures = {
+                            model_path: executor.submit(load_summarization_model, model_path)
+                            for _, model_path in models_to_test
+                        }
+                        
+                        # Get first article
+                        item = result_dict['news'][0]
+                        st.subheader(f"📄 {item['title']}")
+                        st.markdown(f"**🔗 Link:** [{item['link']}]({item['link']})")
+                        
+                        # Load content
+                        article_text = scrape_article_content(item['link'])
+                        
+                        if not article_text or len(article_text) < 100:
+                            st.warning("Using snippet for comparison")
+                            article_text = item['snippet']
+                        
+                        st.divider()
+                        st.subheader("🤖 Model Comparison")
+                        
+                        for model_display, model_path in models_to_test:
+                            with st.spinner(f"Testing {model_display}..."):
+                                test_summarizer = model_futures[model_path].result()
+                                if test_summarizer:
+                                    summary = summary_or_error(article_text, model_path, extra_pass, num_beams)
+                                    
+                                    with st.expander(f"✨ {model_display}", expanded=True):
+                                        st.info(summary)
                     
                     st.success("✅ Comparison complete! Choose your favorite model in the sidebar.")
                     
@@ -7,20 +7,29 @@ import warnings
 warnings.filterwarnings('ignore')
 
 import argparse
+import asyncio
+import atexit
 import datetime
+import functools
+import hashlib
 import logging
 import os
+import queue
 import smtplib
 import ssl
+import string
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from email.message import EmailMessage
-from typing import Dict, List, Tuple, Optional
+from logging.handlers import QueueHandler, QueueListener
+from types import MappingProxyType
+from typing import Dict, Final, List, Mapping, NamedTuple, Tuple, Optional
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import schedule
 import yfinance as yf
 from tqdm import tqdm
 
@@ -33,21 +42,51 @@ except ImportError:
     HAS_SENDGRID = False
     print("⚠️  SendGrid not installed. Run: pip install sendgrid")
 
+# Market calendar import (optional) - lets the market-hours check honor NYSE holidays
+try:
+    import pandas_market_calendars as mcal
+    HAS_MARKET_CALENDARS = True
+except ImportError:
+    HAS_MARKET_CALENDARS = False
+
+# Numba import (optional) - without it the indicator kernels run as plain Python
+try:
+    from numba import njit, types
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    print("⚠️  Numba not installed, indicators will be slower. Run: pip install numba")
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function as plain Python."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 # ═══════════════════════════════════════════════════════════════════
 # CONFIGURATION & LOGGING
 # ═══════════════════════════════════════════════════════════════════
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(message)s',
-    handlers=[
-        logging.FileHandler(f'stock_alerts_{datetime.date.today()}.log'),
-        logging.StreamHandler()
-    ]
-)
+# Setup logging: log calls only enqueue records, and a background listener
+# thread does the file and console writes
+_log_formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(message)s')
+_log_handlers = [
+    logging.FileHandler(f'stock_alerts_{datetime.date.today()}.log'),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_queue = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logging.root.setLevel(logging.INFO)
+logging.root.addHandler(QueueHandler(_log_queue))
 log = logging.getLogger(__name__)
 
+# Columns kept from Yahoo Finance history
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
 # Configuration
 class Config:
     # Email settings
@@ -84,6 +123,12 @@ class Config:
     DATA_START_DATE = '2022-01-01'
     CHECK_INTERVAL_HOURS = 1
     
+    # History cache (Parquet files, one per symbol)
+    ENABLE_CACHE = True
+    CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.cache')
+    # Days re-downloaded before the cache end to detect re-adjusted prices
+    CACHE_OVERLAP_DAYS = 7
+    
     # Signal strength thresholds
     STRONG_SIGNAL_THRESHOLD = 2  # Number of indicators agreeing
 
@@ -91,7 +136,69 @@ class Config:
 # EMAIL NOTIFICATION (YOUR FUNCTION)
 # ═══════════════════════════════════════════════════════════════════
 
-def send_email_to_inform(symbol: str, action: str, text: str, receiver: str, provider: str = "sendgrid"):
+# Hotmail / Outlook SMTP endpoint
+SMTP_SERVER = "smtp.office365.com"
+SMTP_PORT = 587
+
+# Shared SendGrid client, so every email reuses its HTTP keep-alive connection
+_SG_CLIENT: Optional["SendGridAPIClient"] = None
+_SG_LOCK = threading.Lock()
+
+def _get_sg(api_key: str) -> "SendGridAPIClient":
+    """Return the process-wide SendGrid client, creating it on first use."""
+    global _SG_CLIENT
+    with _SG_LOCK:
+        if _SG_CLIENT is None or _SG_CLIENT.api_key != api_key:
+            _SG_CLIENT = SendGridAPIClient(api_key)
+        return _SG_CLIENT
+
+class SMTPPool:
+    """One authenticated SMTP session shared by every message, reopened if the server drops it."""
+    
+    def __init__(self, host: str, port: int, sender: str, password: str, timeout: int = 30):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.password = password
+        self.timeout = timeout
+        self._smtp = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open, secure and log in a new SMTP session."""
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.starttls(context=ssl.create_default_context())  # Secure the connection
+            smtp.login(self.sender, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+    
+    def send(self, msg: EmailMessage):
+        """Send a message over the shared session, reconnecting once if it went stale."""
+        with self._lock:
+            if self._smtp is None:
+                self._smtp = self._connect()
+            try:
+                self._smtp.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = self._connect()
+                self._smtp.send_message(msg)
+    
+    def close(self):
+        """Log out and close the session if one is open."""
+        with self._lock:
+            if self._smtp is None:
+                return
+            try:
+                self._smtp.quit()
+            except smtplib.SMTPException:
+                self._smtp.close()
+            self._smtp = None
+
+def send_email_to_inform(symbol: str, action: str, text: str, receiver: str, provider: str = "sendgrid",
+                         smtp: Optional[SMTPPool] = None):
     """
     Sends an email notification based on a specific event.
 
@@ -104,6 +211,8 @@ def send_email_to_inform(symbol: str, action: str, text: str, receiver: str, pro
         text (str): The body of the email message (can be HTML).
         receiver (str): The recipient's email address.
         provider (str): The email service provider ("sendgrid" or "hotmail").
+        smtp (SMTPPool, optional): Shared Hotmail session to send over instead of
+            opening a new connection for this email.
     
     Returns:
         int: 1 if successful, 0 if failed.
@@ -134,7 +243,7 @@ def send_email_to_inform(symbol: str, action: str, text: str, receiver: str, pro
         )
 
         try:
-            sg = SendGridAPIClient(api_key)
+            sg = _get_sg(api_key)
             response = sg.send(message)
 
             if response.status_code == 202:
@@ -177,21 +286,20 @@ def send_email_to_inform(symbol: str, action: str, text: str, receiver: str, pro
         # Set content (supports HTML)
         msg.set_content(text, subtype='html')
 
-        # Use a secure SSL context
-        context = ssl.create_default_context()
-        smtp_server = "smtp.office365.com"
-        smtp_port = 587
-
         try:
-            with smtplib.SMTP(smtp_server, smtp_port, timeout=30) as smtp:
-                smtp.starttls(context=context)  # Secure the connection
-                smtp.login(sender, sender_pass)
-                smtp.send_message(msg)
-                log.info("### Email Sent Successfully via Hotmail ###")
-                log.info(f"To: {receiver}")
-                log.info(f"Subject: {msg['Subject']}")
-                log.info("---")
-                return 1
+            if smtp is None:
+                smtp = SMTPPool(SMTP_SERVER, SMTP_PORT, sender, sender_pass)
+                try:
+                    smtp.send(msg)
+                finally:
+                    smtp.close()
+            else:
+                smtp.send(msg)
+            log.info("### Email Sent Successfully via Hotmail ###")
+            log.info(f"To: {receiver}")
+            log.info(f"Subject: {msg['Subject']}")
+            log.info("---")
+            return 1
         except smtplib.SMTPAuthenticationError:
             log.error("Error: Failed to authenticate. Check your email and password.")
         except Exception as e:
@@ -205,6 +313,56 @@ def send_email_to_inform(symbol: str, action: str, text: str, receiver: str, pro
 # ═══════════════════════════════════════════════════════════════════
 # GENERATE REPORTS & PLOTS
 # ═══════════════════════════════════════════════════════════════════
+# Color mappings for the report's Action column
+_ACTION_COLORS: Final[Mapping[str, str]] = MappingProxyType({
+    'STRONG BUY': '#1F7A8C', # Teal/Strong Green
+    'BUY': '#25AE7D',       # Medium Green
+    'HOLD': '#5F5F5F',       # Gray
+    'SELL': '#FF9900',       # Orange
+    'STRONG SELL': '#D92121'  # Red
+})
+
+# Price change colors
+_POS_COLOR: Final = '#25AE7D'
+_NEG_COLOR: Final = '#D92121'
+
+# Outer skeleton of the daily report; rows are filled in per symbol
+_REPORT_TEMPLATE = string.Template("""
+    <html>
+    <head>
+        <style>
+            body { font-family: Arial, sans-serif; background-color: #f4f4f9; color: #333; }
+            .container { width: 90%; margin: 20px auto; background-color: #ffffff; padding: 20px; border-radius: 8px; box-shadow: 0 4px 8px rgba(0,0,0,0.1); }
+            h2 { color: #1F7A8C; border-bottom: 2px solid #ccc; padding-bottom: 10px; }
+            table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+            th { background-color: #e0e0e0; color: #333; padding: 12px; text-align: left; border-bottom: 2px solid #ccc; }
+            .signal-details td { font-size: 0.9em; color: #555; }
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h2>📈 Trading Signal Report ($date)</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th style="width: 8%;">Symbol</th>
+                        <th style="width: 10%;">Action</th>
+                        <th style="width: 8%; text-align: right;">Signal Strength</th>
+                        <th style="width: 10%; text-align: right;">Current Price</th>
+                        <th style="width: 10%; text-align: right;">24h % Change</th>
+                        <th style="width: 50%;">Key Signals</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    $rows
+                </tbody>
+            </table>
+            <p style="margin-top: 30px; color: #777; font-size: 0.8em;">Note: Indicators like RSI, Bollinger Bands, and STOCH were used to generate these signals.</p>
+        </div>
+    </body>
+    </html>
+    """)
+
 def generate_report_content(report_data: dict) -> tuple[str, str]:
     """
     Transforms the trading signal dictionary into a formatted HTML report and a plain text summary.
@@ -215,18 +373,9 @@ def generate_report_content(report_data: dict) -> tuple[str, str]:
     Returns:
         tuple[str, str]: A tuple containing (html_content, text_summary).
     """
-    html_rows = ""
+    rows = []
     text_lines = []
     
-    # Define color mappings for the Action column
-    ACTION_COLORS = {
-        'STRONG BUY': '#1F7A8C', # Teal/Strong Green
-        'BUY': '#25AE7D',       # Medium Green
-        'HOLD': '#5F5F5F',       # Gray
-        'SELL': '#FF9900',       # Orange
-        'STRONG SELL': '#D92121'  # Red
-    }
-
     # Iterate over each symbol and its data
     for symbol, data in report_data.items():
         # Safely convert numpy types to standard floats and format
@@ -237,13 +386,13 @@ def generate_report_content(report_data: dict) -> tuple[str, str]:
         signals = '<br>'.join(data.get('signals', ['No specific signals.']))
         
         # Determine the color for the Action cell
-        action_color = ACTION_COLORS.get(action, '#5F5F5F')
+        action_color = _ACTION_COLORS.get(action, '#5F5F5F')
         
         # Determine the price change color
-        price_color = '#D92121' if price_change_pct < 0 else '#25AE7D'
+        price_color = _POS_COLOR if price_change_pct >= 0 else _NEG_COLOR
 
         # Build the HTML row for the symbol
-        html_rows += f"""
+        rows.append(f"""
         <tr style="border-bottom: 1px solid #ccc;">
             <td style="padding: 10px; font-weight: bold; font-size: 1.1em; color: #1F7A8C;">{symbol}</td>
             <td style="padding: 10px; font-weight: bold; color: {action_color};">{action}</td>
@@ -252,7 +401,7 @@ def generate_report_content(report_data: dict) -> tuple[str, str]:
             <td style="padding: 10px; text-align: right; color: {price_color};">{price_change_pct:.2f}%</td>
             <td style="padding: 10px; font-size: 0.9em;">{signals}</td>
         </tr>
-        """
+        """)
         
         # Build the plain text summary line
         text_lines.append(
@@ -261,41 +410,10 @@ def generate_report_content(report_data: dict) -> tuple[str, str]:
         )
 
     # --- Construct the Final HTML Content ---
-    html_content = f"""
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; background-color: #f4f4f9; color: #333; }}
-            .container {{ width: 90%; margin: 20px auto; background-color: #ffffff; padding: 20px; border-radius: 8px; box-shadow: 0 4px 8px rgba(0,0,0,0.1); }}
-            h2 {{ color: #1F7A8C; border-bottom: 2px solid #ccc; padding-bottom: 10px; }}
-            table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-            th {{ background-color: #e0e0e0; color: #333; padding: 12px; text-align: left; border-bottom: 2px solid #ccc; }}
-            .signal-details td {{ font-size: 0.9em; color: #555; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h2>📈 Trading Signal Report ({datetime.date.today().strftime("%Y-%m-%d")})</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th style="width: 8%;">Symbol</th>
-                        <th style="width: 10%;">Action</th>
-                        <th style="width: 8%; text-align: right;">Signal Strength</th>
-                        <th style="width: 10%; text-align: right;">Current Price</th>
-                        <th style="width: 10%; text-align: right;">24h % Change</th>
-                        <th style="width: 50%;">Key Signals</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {html_rows}
-                </tbody>
-            </table>
-            <p style="margin-top: 30px; color: #777; font-size: 0.8em;">Note: Indicators like RSI, Bollinger Bands, and STOCH were used to generate these signals.</p>
-        </div>
-    </body>
-    </html>
-    """
+    html_content = _REPORT_TEMPLATE.substitute(
+        date=datetime.date.today().strftime("%Y-%m-%d"),
+        rows=''.join(rows)
+    )
 
     # --- Construct the Final Text Content ---
     text_summary = "Trading Report for Today:\n" + "\n".join(text_lines)
@@ -303,6 +421,248 @@ def generate_report_content(report_data: dict) -> tuple[str, str]:
     return html_content, text_summary
 
 
+# ═══════════════════════════════════════════════════════════════════
+# INDICATOR KERNELS
+# ═══════════════════════════════════════════════════════════════════
+
+# fastmath without 'nnan': full fastmath lets LLVM assume no NaNs and drop
+# the isnan checks below
+@njit(cache=True, fastmath={'contract', 'arcp', 'afn', 'reassoc'}, nogil=True)
+def _roll_mean_std_nb(arr, w):
+    """Rolling mean and sample std in one pass, keeping a running sum and sum of squares.
+
+    NaNs are left out of the sums and a window holding one gives NaN, like
+    pandas rolling with min_periods=window; values recover once it slides out.
+    """
+    n = arr.size
+    mean = np.empty(n)
+    std = np.empty(n)
+    s = 0.0
+    s2 = 0.0
+    valid = 0
+    for i in range(n):
+        x = arr[i]
+        if not np.isnan(x):
+            s += x
+            s2 += x * x
+            valid += 1
+        if i >= w:
+            old = arr[i - w]
+            if not np.isnan(old):
+                s -= old
+                s2 -= old * old
+                valid -= 1
+        if valid < w:
+            mean[i] = np.nan
+            std[i] = np.nan
+            continue
+        m = s / w
+        var = (s2 - m * m * w) / (w - 1)
+        mean[i] = m
+        # Rounding can push a flat window's variance slightly below zero
+        std[i] = np.sqrt(var) if var > 0.0 else 0.0
+    return mean, std
+
+def _rolling_mean_std(values: pd.Series, window: int) -> Tuple[pd.Series, pd.Series]:
+    """Run the rolling mean/std kernel on a Series and wrap the results back up."""
+    mean, std = _roll_mean_std_nb(values.to_numpy(dtype=np.float64), window)
+    return pd.Series(mean, index=values.index), pd.Series(std, index=values.index)
+
+@njit(cache=True, nogil=True)
+def _rolling_extreme(arr, w, want_max):
+    """Rolling max (or min) using a monotonic deque of indices, O(1) amortized per value.
+
+    NaNs never enter the deque and a window holding one gives NaN, like
+    pandas rolling with min_periods=window.
+    """
+    n = arr.size
+    out = np.empty(n)
+    window = np.empty(n, np.int64)
+    head = 0
+    tail = 0
+    last_nan = -w
+    for i in range(n):
+        x = arr[i]
+        if np.isnan(x):
+            last_nan = i
+        else:
+            # Drop earlier candidates the new value beats; they can't be the extreme again
+            while tail > head and ((arr[window[tail - 1]] <= x) if want_max
+                                   else (arr[window[tail - 1]] >= x)):
+                tail -= 1
+            window[tail] = i
+            tail += 1
+        # Drop the front once it has slid out of the window
+        if tail > head and window[head] <= i - w:
+            head += 1
+        out[i] = arr[window[head]] if i >= w - 1 and last_nan <= i - w else np.nan
+    return out
+
+def _rolling_min(values: pd.Series, window: int) -> pd.Series:
+    """Rolling minimum of a Series."""
+    return pd.Series(_rolling_extreme(values.to_numpy(dtype=np.float64), window, False), index=values.index)
+
+def _rolling_max(values: pd.Series, window: int) -> pd.Series:
+    """Rolling maximum of a Series."""
+    return pd.Series(_rolling_extreme(values.to_numpy(dtype=np.float64), window, True), index=values.index)
+
+@njit(cache=True, nogil=True)
+def _tail_mean(arr, w):
+    """Mean of the last w values (NaN if there are fewer)."""
+    n = arr.size
+    if n < w:
+        return np.nan
+    s = 0.0
+    for i in range(n - w, n):
+        s += arr[i]
+    return s / w
+
+@njit(cache=True, nogil=True)
+def _tail_std(arr, w):
+    """Sample std of the last w values (NaN if there are fewer)."""
+    n = arr.size
+    if n < w or w < 2:
+        return np.nan
+    m = _tail_mean(arr, w)
+    s2 = 0.0
+    for i in range(n - w, n):
+        d = arr[i] - m
+        s2 += d * d
+    return np.sqrt(s2 / (w - 1))
+
+@njit(cache=True, nogil=True)
+def _rsi_value(avg_gain, avg_loss):
+    """RSI from average gain and loss (NaN when the price never moved)."""
+    if avg_loss > 0.0:
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return 100.0 if avg_gain > 0.0 else np.nan
+
+@njit(cache=True, nogil=True)
+def _rsi_wilder(close, n):
+    """RSI with Wilder's smoothing, seeded with the simple average of the first n changes."""
+    size = close.size
+    out = np.full(size, np.nan)
+    if size <= n:
+        return out
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n + 1):
+        d = close[i] - close[i - 1]
+        if d > 0.0:
+            avg_gain += d
+        else:
+            avg_loss -= d
+    avg_gain /= n
+    avg_loss /= n
+    out[n] = _rsi_value(avg_gain, avg_loss)
+    for i in range(n + 1, size):
+        d = close[i] - close[i - 1]
+        avg_gain = (avg_gain * (n - 1) + max(d, 0.0)) / n
+        avg_loss = (avg_loss * (n - 1) + max(-d, 0.0)) / n
+        out[i] = _rsi_value(avg_gain, avg_loss)
+    return out
+
+@njit(cache=True, nogil=True)
+def _macd_tail(close, fast, slow, sig):
+    """Last and previous MACD/signal values, with the three EMAs kept as scalars in one pass."""
+    alpha_fast = 2.0 / (fast + 1)
+    alpha_slow = 2.0 / (slow + 1)
+    alpha_signal = 2.0 / (sig + 1)
+    # EMAs start from the first price, like ewm(adjust=False)
+    ema_fast = float(close[0])
+    ema_slow = float(close[0])
+    macd = 0.0
+    signal = 0.0
+    macd_prev = np.nan
+    signal_prev = np.nan
+    for i in range(1, close.size):
+        macd_prev = macd
+        signal_prev = signal
+        ema_fast += alpha_fast * (close[i] - ema_fast)
+        ema_slow += alpha_slow * (close[i] - ema_slow)
+        macd = ema_fast - ema_slow
+        signal += alpha_signal * (macd - signal)
+    return macd, signal, macd_prev, signal_prev
+
+@njit(cache=True, nogil=True)
+def _indicator_tail(close, high, low, volume, bb_short, bb_long, rsi_window,
+                    macd_fast, macd_slow, macd_signal):
+    """Latest values of every indicator SignalGenerator uses, in one call.
+
+    Rolling indicators only need their last window, so they are summed over
+    that slice alone; Wilder's RSI and the EMAs behind MACD are recursive and
+    run once over the whole series.
+    """
+    n = close.size
+
+    # Bollinger Bands (2 std) and moving averages
+    mid = _tail_mean(close, bb_short)
+    std = _tail_std(close, bb_short)
+    bb_upper_short = mid + 2.0 * std
+    bb_lower_short = mid - 2.0 * std
+    mid = _tail_mean(close, bb_long)
+    std = _tail_std(close, bb_long)
+    bb_upper_long = mid + 2.0 * std
+    bb_lower_long = mid - 2.0 * std
+    sma_20 = _tail_mean(close, 20)
+    sma_50 = _tail_mean(close, 50)
+    sma_200 = _tail_mean(close, 200)
+
+    rsi = _rsi_wilder(close, rsi_window)[n - 1]
+
+    macd, signal, macd_prev, signal_prev = _macd_tail(close, macd_fast, macd_slow, macd_signal)
+
+    # ATR and stochastic %K over the last 14 bars
+    atr = np.nan
+    stoch_k = np.nan
+    if n >= 14:
+        tr_sum = 0.0
+        lowest = low[n - 14]
+        highest = high[n - 14]
+        for i in range(n - 14, n):
+            tr = high[i] - low[i]
+            if i > 0:
+                prev_close = close[i - 1]
+                tr = max(tr, abs(high[i] - prev_close), abs(low[i] - prev_close))
+            tr_sum += tr
+            lowest = min(lowest, low[i])
+            highest = max(highest, high[i])
+        atr = tr_sum / 14
+        if highest > lowest:
+            stoch_k = 100.0 * (close[n - 1] - lowest) / (highest - lowest)
+
+    avg_volume = _tail_mean(volume, 20) if volume.size > 0 else np.nan
+
+    return (rsi, macd, signal, macd_prev, signal_prev,
+            bb_upper_short, bb_lower_short, bb_upper_long, bb_lower_long,
+            atr, stoch_k, sma_20, sma_50, sma_200, avg_volume)
+
+if HAS_NUMBA:
+    # Compile (or load from Numba's on-disk cache) every kernel now for the
+    # exact types it is called with, so the first symbol doesn't pay the JIT.
+    # Callers pass C-contiguous arrays, read-only when they are views of pandas
+    # data under copy-on-write; SignalGenerator gets float32 prices
+    def _c_arrays(dtype):
+        return [types.Array(dtype, 1, 'C', readonly=readonly) for readonly in (True, False)]
+
+    _KERNEL_SIGNATURES = []
+    for _arr in _c_arrays(types.float64):
+        _KERNEL_SIGNATURES += [
+            (_roll_mean_std_nb, (_arr, types.int64)),
+            (_rolling_extreme, (_arr, types.int64, types.boolean)),
+            (_rsi_wilder, (_arr, types.int64)),
+            (_macd_tail, (_arr, types.int64, types.int64, types.int64)),
+        ]
+    for _dtype in (types.float32, types.float64):
+        _writable = types.Array(_dtype, 1, 'C')
+        for _arr in _c_arrays(_dtype):
+            # Without a Volume column the kernel gets a fresh (writable) empty array
+            for _volume in {_arr, _writable}:
+                _KERNEL_SIGNATURES.append(
+                    (_indicator_tail, (_arr, _arr, _arr, _volume) + (types.int64,) * 6))
+    for _kernel, _signature in _KERNEL_SIGNATURES:
+        _kernel.compile(_signature)
+
 # ═══════════════════════════════════════════════════════════════════
 # TECHNICAL INDICATORS
 # ═══════════════════════════════════════════════════════════════════
@@ -313,7 +673,7 @@ class TechnicalIndicators:
     @staticmethod
     def sma(prices: pd.Series, window: int) -> pd.Series:
         """Simple Moving Average."""
-        return prices.rolling(window=window).mean()
+        return _rolling_mean_std(prices, window)[0]
     
     @staticmethod
     def ema(prices: pd.Series, window: int) -> pd.Series:
@@ -323,21 +683,15 @@ class TechnicalIndicators:
     @staticmethod
     def bollinger_bands(prices: pd.Series, window: int = 20, num_std: float = 2.0) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """Calculate Bollinger Bands."""
-        sma = TechnicalIndicators.sma(prices, window)
-        std = prices.rolling(window=window).std()
+        sma, std = _rolling_mean_std(prices, window)
         upper = sma + (std * num_std)
         lower = sma - (std * num_std)
         return upper, sma, lower
     
     @staticmethod
     def rsi(prices: pd.Series, window: int = 14) -> pd.Series:
-        """Relative Strength Index."""
-        delta = prices.diff()
-        gain = delta.where(delta > 0, 0).rolling(window=window).mean()
-        loss = -delta.where(delta < 0, 0).rolling(window=window).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        """Relative Strength Index (Wilder's smoothing)."""
+        return pd.Series(_rsi_wilder(prices.to_numpy(dtype=np.float64), window), index=prices.index)
     
     @staticmethod
     def macd(prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
@@ -349,21 +703,30 @@ class TechnicalIndicators:
         histogram = macd_line - signal_line
         return macd_line, signal_line, histogram
     
+    @staticmethod
+    def macd_tail(prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[float, float, float, float]:
+        """Latest MACD and signal values plus the previous ones (for crossovers), without full series."""
+        return _macd_tail(prices.to_numpy(dtype=np.float64), fast, slow, signal)
+    
     @staticmethod
     def atr(high: pd.Series, low: pd.Series, close: pd.Series, window: int = 14) -> pd.Series:
         """Average True Range (volatility indicator)."""
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=window).mean()
-        return atr
+        high_v = high.to_numpy(dtype=np.float64)
+        low_v = low.to_numpy(dtype=np.float64)
+        close_v = close.to_numpy(dtype=np.float64)
+        prev_close = np.empty_like(close_v)
+        prev_close[0] = np.nan
+        prev_close[1:] = close_v[:-1]
+        # fmax skips the NaN on the first bar (its true range is just high - low)
+        tr = np.fmax.reduce([high_v - low_v, np.abs(high_v - prev_close), np.abs(low_v - prev_close)])
+        atr, _ = _roll_mean_std_nb(tr, window)
+        return pd.Series(atr, index=close.index)
     
     @staticmethod
     def stochastic_oscillator(high: pd.Series, low: pd.Series, close: pd.Series, window: int = 14) -> Tuple[pd.Series, pd.Series]:
         """Stochastic Oscillator."""
-        lowest_low = low.rolling(window=window).min()
-        highest_high = high.rolling(window=window).max()
+        lowest_low = _rolling_min(low, window)
+        highest_high = _rolling_max(high, window)
         k = 100 * (close - lowest_low) / (highest_high - lowest_low)
         d = k.rolling(window=3).mean()
         return k, d
@@ -372,6 +735,47 @@ class TechnicalIndicators:
 # SIGNAL GENERATOR
 # ═══════════════════════════════════════════════════════════════════
 
+# Weight of each indicator's vote in the signal strength, in SignalGenerator's order
+_SIGNAL_WEIGHTS = np.array([1.0, 1.0, 1.0, 1.0, 0.5, 0.5])
+
+# Signal text for each (indicator, vote) pair
+_SIGNAL_MSGS: Final[Mapping[Tuple[int, int], str]] = MappingProxyType({
+    (0, 1): "🟢 BB_SHORT: Price below lower band (oversold)",
+    (0, -1): "🔴 BB_SHORT: Price above upper band (overbought)",
+    (1, 1): "🟢 BB_LONG: Price below lower band (strong oversold)",
+    (1, -1): "🔴 BB_LONG: Price above upper band (strong overbought)",
+    (2, 1): "🟢 RSI: Oversold ({rsi:.1f} < {oversold})",
+    (2, -1): "🔴 RSI: Overbought ({rsi:.1f} > {overbought})",
+    (3, 1): "🟢 MACD: Bullish crossover",
+    (3, -1): "🔴 MACD: Bearish crossover",
+    (4, 1): "🟢 MA: Price above SMA(20) and SMA(50) - Uptrend",
+    (4, -1): "🔴 MA: Price below SMA(20) and SMA(50) - Downtrend",
+    (5, 1): "🟢 STOCH: Oversold ({stoch_k:.1f})",
+    (5, -1): "🔴 STOCH: Overbought ({stoch_k:.1f})",
+})
+
+def _vote(bullish, bearish) -> int:
+    """+1 for a bullish reading, -1 for a bearish one, 0 for neither (or NaN)."""
+    return int(bullish) - int(bearish)
+
+class IndicatorTail(NamedTuple):
+    """Latest indicator values (plus the previous MACD/signal for crossovers)."""
+    rsi: float
+    macd: float
+    signal: float
+    macd_prev: float
+    signal_prev: float
+    bb_upper_short: float
+    bb_lower_short: float
+    bb_upper_long: float
+    bb_lower_long: float
+    atr: float
+    stoch_k: float
+    sma_20: float
+    sma_50: float
+    sma_200: float
+    avg_volume: float
+
 class SignalGenerator:
     """Generate trading signals based on multiple indicators."""
     
@@ -379,97 +783,69 @@ class SignalGenerator:
         self.df = df
         self.config = config
         self.signals = {}
+    
+    def _compute_tail(self, close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                      volume: np.ndarray) -> IndicatorTail:
+        """Compute every indicator's latest value in one fused kernel call."""
+        return IndicatorTail._make(_indicator_tail(
+            close, high, low, volume,
+            self.config.BOLLINGER_WINDOW_SHORT, self.config.BOLLINGER_WINDOW_LONG,
+            self.config.RSI_WINDOW,
+            self.config.MACD_FAST, self.config.MACD_SLOW, self.config.MACD_SIGNAL
+        ))
         
     def analyze(self) -> Dict[str, any]:
         """Run all technical analysis and generate signals."""
-        close = self.df['Close']
-        high = self.df['High']
-        low = self.df['Low']
+        # Raw price arrays (views, no copies), read once
+        close_np = self.df['Close'].to_numpy(copy=False)
+        high_np = self.df['High'].to_numpy(copy=False)
+        low_np = self.df['Low'].to_numpy(copy=False)
+        has_volume = 'Volume' in self.df.columns
+        vol_np = self.df['Volume'].to_numpy(copy=False) if has_volume else np.zeros(0, dtype=close_np.dtype)
         
         # Current price info
-        current_price = close.iloc[-1]
-        prev_close = close.iloc[-2] if len(close) > 1 else current_price
+        current_price = close_np[-1]
+        prev_close = close_np[-2] if close_np.size > 1 else current_price
         price_change = ((current_price - prev_close) / prev_close) * 100
         
-        # Calculate all indicators
-        bb_upper_short, bb_mid_short, bb_lower_short = TechnicalIndicators.bollinger_bands(
-            close, self.config.BOLLINGER_WINDOW_SHORT
-        )
-        bb_upper_long, bb_mid_long, bb_lower_long = TechnicalIndicators.bollinger_bands(
-            close, self.config.BOLLINGER_WINDOW_LONG
-        )
-        
-        rsi = TechnicalIndicators.rsi(close, self.config.RSI_WINDOW)
-        macd_line, signal_line, histogram = TechnicalIndicators.macd(close)
-        atr = TechnicalIndicators.atr(high, low, close)
-        stoch_k, stoch_d = TechnicalIndicators.stochastic_oscillator(high, low, close)
-        
-        sma_20 = TechnicalIndicators.sma(close, 20)
-        sma_50 = TechnicalIndicators.sma(close, 50)
-        sma_200 = TechnicalIndicators.sma(close, 200)
+        # Calculate all indicators (latest values only)
+        tail = self._compute_tail(close_np, high_np, low_np, vol_np)
         
         # Get current values
-        current_rsi = rsi.iloc[-1]
-        current_macd = macd_line.iloc[-1]
-        current_signal = signal_line.iloc[-1]
-        current_stoch_k = stoch_k.iloc[-1]
-        current_atr = atr.iloc[-1]
+        current_rsi = tail.rsi
+        current_macd = tail.macd
+        current_signal = tail.signal
+        current_stoch_k = tail.stoch_k
+        current_atr = tail.atr
         
-        # Generate signals
-        signals = []
-        signal_strength = 0
-        action = "HOLD"
-        
-        # 1. Bollinger Bands (Short-term)
-        if current_price < bb_lower_short.iloc[-1]:
-            signals.append("🟢 BB_SHORT: Price below lower band (oversold)")
-            signal_strength += 1
-            action = "BUY"
-        elif current_price > bb_upper_short.iloc[-1]:
-            signals.append("🔴 BB_SHORT: Price above upper band (overbought)")
-            signal_strength -= 1
-            action = "SELL"
+        # Generate signals: each indicator votes +1 (bullish), -1 (bearish) or 0
+        votes = np.array([
+            # 1. Bollinger Bands (Short-term)
+            _vote(current_price < tail.bb_lower_short, current_price > tail.bb_upper_short),
+            # 2. Bollinger Bands (Long-term)
+            _vote(current_price < tail.bb_lower_long, current_price > tail.bb_upper_long),
+            # 3. RSI
+            _vote(current_rsi < self.config.RSI_OVERSOLD, current_rsi > self.config.RSI_OVERBOUGHT),
+            # 4. MACD crossover
+            _vote(current_macd > current_signal and tail.macd_prev <= tail.signal_prev,
+                  current_macd < current_signal and tail.macd_prev >= tail.signal_prev),
+            # 5. Moving Average trend
+            _vote(current_price > tail.sma_20 > tail.sma_50, current_price < tail.sma_20 < tail.sma_50),
+            # 6. Stochastic Oscillator
+            _vote(current_stoch_k < 20, current_stoch_k > 80),
+        ], dtype=np.int8)
+        signal_strength = float(votes @ _SIGNAL_WEIGHTS)
         
-        # 2. Bollinger Bands (Long-term)
-        if current_price < bb_lower_long.iloc[-1]:
-            signals.append("🟢 BB_LONG: Price below lower band (strong oversold)")
-            signal_strength += 1
-        elif current_price > bb_upper_long.iloc[-1]:
-            signals.append("🔴 BB_LONG: Price above upper band (strong overbought)")
-            signal_strength -= 1
-        
-        # 3. RSI
-        if current_rsi < self.config.RSI_OVERSOLD:
-            signals.append(f"🟢 RSI: Oversold ({current_rsi:.1f} < {self.config.RSI_OVERSOLD})")
-            signal_strength += 1
-        elif current_rsi > self.config.RSI_OVERBOUGHT:
-            signals.append(f"🔴 RSI: Overbought ({current_rsi:.1f} > {self.config.RSI_OVERBOUGHT})")
-            signal_strength -= 1
-        
-        # 4. MACD
-        if current_macd > current_signal and macd_line.iloc[-2] <= signal_line.iloc[-2]:
-            signals.append("🟢 MACD: Bullish crossover")
-            signal_strength += 1
-        elif current_macd < current_signal and macd_line.iloc[-2] >= signal_line.iloc[-2]:
-            signals.append("🔴 MACD: Bearish crossover")
-            signal_strength -= 1
-        
-        # 5. Moving Average Crossovers
-        if len(sma_20) > 0 and len(sma_50) > 0:
-            if current_price > sma_20.iloc[-1] > sma_50.iloc[-1]:
-                signals.append("🟢 MA: Price above SMA(20) and SMA(50) - Uptrend")
-                signal_strength += 0.5
-            elif current_price < sma_20.iloc[-1] < sma_50.iloc[-1]:
-                signals.append("🔴 MA: Price below SMA(20) and SMA(50) - Downtrend")
-                signal_strength -= 0.5
-        
-        # 6. Stochastic Oscillator
-        if current_stoch_k < 20:
-            signals.append(f"🟢 STOCH: Oversold ({current_stoch_k:.1f})")
-            signal_strength += 0.5
-        elif current_stoch_k > 80:
-            signals.append(f"🔴 STOCH: Overbought ({current_stoch_k:.1f})")
-            signal_strength -= 0.5
+        values = {
+            'rsi': current_rsi,
+            'stoch_k': current_stoch_k,
+            'oversold': self.config.RSI_OVERSOLD,
+            'overbought': self.config.RSI_OVERBOUGHT,
+        }
+        signals = [
+            _SIGNAL_MSGS[(idx, vote)].format(**values)
+            for idx, vote in enumerate(votes.tolist()) if vote
+        ]
         
         # Determine final action based on signal strength
         if signal_strength >= self.config.STRONG_SIGNAL_THRESHOLD:
@@ -484,9 +860,9 @@ class SignalGenerator:
             action = "HOLD"
         
         # Add volume analysis if available
-        if 'Volume' in self.df.columns:
-            avg_volume = self.df['Volume'].rolling(20).mean().iloc[-1]
-            current_volume = self.df['Volume'].iloc[-1]
+        if has_volume:
+            avg_volume = tail.avg_volume
+            current_volume = vol_np[-1]
             volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
             
             if volume_ratio > 1.5:
@@ -504,15 +880,15 @@ class SignalGenerator:
                 'rsi': current_rsi,
                 'macd': current_macd,
                 'macd_signal': current_signal,
-                'bb_lower_short': bb_lower_short.iloc[-1],
-                'bb_upper_short': bb_upper_short.iloc[-1],
-                'bb_lower_long': bb_lower_long.iloc[-1],
-                'bb_upper_long': bb_upper_long.iloc[-1],
+                'bb_lower_short': tail.bb_lower_short,
+                'bb_upper_short': tail.bb_upper_short,
+                'bb_lower_long': tail.bb_lower_long,
+                'bb_upper_long': tail.bb_upper_long,
                 'atr': current_atr,
                 'stoch_k': current_stoch_k,
-                'sma_20': sma_20.iloc[-1] if len(sma_20) > 0 else None,
-                'sma_50': sma_50.iloc[-1] if len(sma_50) > 0 else None,
-                'sma_200': sma_200.iloc[-1] if len(sma_200) > 0 else None,
+                'sma_20': tail.sma_20,
+                'sma_50': tail.sma_50,
+                'sma_200': tail.sma_200,
             },
             'signals': signals
         }
@@ -523,11 +899,76 @@ class SignalGenerator:
 # EMAIL NOTIFICATION WRAPPER
 # ═══════════════════════════════════════════════════════════════════
 
+# Header colors of the alert email, per action
+_ALERT_COLORS: Final[Mapping[str, str]] = MappingProxyType({
+    'STRONG BUY': '#00C853',
+    'BUY': '#4CAF50',
+    'HOLD': '#FFC107',
+    'SELL': '#FF5722',
+    'STRONG SELL': '#D32F2F'
+})
+
+# Body of a single-symbol alert email
+_ALERT_TEMPLATE = string.Template("""
+        <html>
+        <head>
+            <style>
+                body { font-family: Arial, sans-serif; }
+                .header { background-color: $color; color: white; padding: 20px; border-radius: 5px; }
+                .content { padding: 20px; }
+                .indicator { background-color: #f5f5f5; padding: 10px; margin: 10px 0; border-radius: 5px; }
+                table { border-collapse: collapse; width: 100%; }
+                td { padding: 8px; border: 1px solid #ddd; }
+            </style>
+        </head>
+        <body>
+            <div class="header">
+                <h1>$symbol: $action</h1>
+                <h2>Signal Strength: $strength</h2>
+            </div>
+            
+            <div class="content">
+                <h3>💰 Price Info</h3>
+                <table>
+                    <tr>
+                        <td><strong>Current Price:</strong></td>
+                        <td>$$$price</td>
+                    </tr>
+                    <tr>
+                        <td><strong>Change:</strong></td>
+                        <td>$change%</td>
+                    </tr>
+                </table>
+                
+                <h3>📊 Indicators</h3>
+                <table>
+                    <tr><td><strong>RSI:</strong></td><td>$rsi</td></tr>
+                    <tr><td><strong>MACD:</strong></td><td>$macd</td></tr>
+                    <tr><td><strong>Stochastic:</strong></td><td>$stoch_k</td></tr>
+                    <tr><td><strong>BB Lower (Short):</strong></td><td>$$$bb_lower_short</td></tr>
+                    <tr><td><strong>BB Upper (Short):</strong></td><td>$$$bb_upper_short</td></tr>
+                </table>
+                
+                <h3>🎯 Signals Detected</h3>
+                $signals
+                
+                <p><em>Generated at: $generated_at</em></p>
+            </div>
+        </body>
+        </html>
+        """)
+
 class EmailNotifier:
     """Send email notifications for trading signals."""
     
     def __init__(self, config: Config):
         self.config = config
+        # Connects lazily on the first Hotmail alert, then stays open
+        self._smtp = SMTPPool(SMTP_SERVER, SMTP_PORT, config.SENDER_EMAIL, config.SENDER_PASSWORD)
+    
+    def close(self):
+        """Close the shared SMTP session."""
+        self._smtp.close()
         
     def send_alert(self, symbol: str, analysis: Dict) -> bool:
         """Send email alert for a trading signal."""
@@ -562,73 +1003,34 @@ class EmailNotifier:
             action=analysis['action'],
             text=html_body,
             receiver=self.config.RECEIVER_EMAIL,
-            provider=self.config.EMAIL_PROVIDER
+            provider=self.config.EMAIL_PROVIDER,
+            smtp=self._smtp
         )
         
         return result == 1
     
     def _create_html_body(self, symbol: str, analysis: Dict) -> str:
         """Create HTML email body."""
-        action_color = {
-            'STRONG BUY': '#00C853',
-            'BUY': '#4CAF50',
-            'HOLD': '#FFC107',
-            'SELL': '#FF5722',
-            'STRONG SELL': '#D32F2F'
-        }
-        
-        color = action_color.get(analysis['action'], '#757575')
+        color = _ALERT_COLORS.get(analysis['action'], '#757575')
         
         signals_html = '<ul>' + ''.join([f'<li>{s}</li>' for s in analysis['signals']]) + '</ul>'
         
-        html = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; }}
-                .header {{ background-color: {color}; color: white; padding: 20px; border-radius: 5px; }}
-                .content {{ padding: 20px; }}
-                .indicator {{ background-color: #f5f5f5; padding: 10px; margin: 10px 0; border-radius: 5px; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                td {{ padding: 8px; border: 1px solid #ddd; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>{symbol}: {analysis['action']}</h1>
-                <h2>Signal Strength: {analysis['signal_strength']:.1f}</h2>
-            </div>
-            
-            <div class="content">
-                <h3>💰 Price Info</h3>
-                <table>
-                    <tr>
-                        <td><strong>Current Price:</strong></td>
-                        <td>${analysis['current_price']:.2f}</td>
-                    </tr>
-                    <tr>
-                        <td><strong>Change:</strong></td>
-                        <td>{analysis['price_change_pct']:+.2f}%</td>
-                    </tr>
-                </table>
-                
-                <h3>📊 Indicators</h3>
-                <table>
-                    <tr><td><strong>RSI:</strong></td><td>{analysis['indicators']['rsi']:.1f}</td></tr>
-                    <tr><td><strong>MACD:</strong></td><td>{analysis['indicators']['macd']:.2f}</td></tr>
-                    <tr><td><strong>Stochastic:</strong></td><td>{analysis['indicators']['stoch_k']:.1f}</td></tr>
-                    <tr><td><strong>BB Lower (Short):</strong></td><td>${analysis['indicators']['bb_lower_short']:.2f}</td></tr>
-                    <tr><td><strong>BB Upper (Short):</strong></td><td>${analysis['indicators']['bb_upper_short']:.2f}</td></tr>
-                </table>
-                
-                <h3>🎯 Signals Detected</h3>
-                {signals_html}
-                
-                <p><em>Generated at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</em></p>
-            </div>
-        </body>
-        </html>
-        """
+        indicators = analysis['indicators']
+        html = _ALERT_TEMPLATE.substitute(
+            color=color,
+            symbol=symbol,
+            action=analysis['action'],
+            strength=f"{analysis['signal_strength']:.1f}",
+            price=f"{analysis['current_price']:.2f}",
+            change=f"{analysis['price_change_pct']:+.2f}",
+            rsi=f"{indicators['rsi']:.1f}",
+            macd=f"{indicators['macd']:.2f}",
+            stoch_k=f"{indicators['stoch_k']:.1f}",
+            bb_lower_short=f"{indicators['bb_lower_short']:.2f}",
+            bb_upper_short=f"{indicators['bb_upper_short']:.2f}",
+            signals=signals_html,
+            generated_at=datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
         
         return html
 
@@ -636,28 +1038,196 @@ class EmailNotifier:
 # MAIN ANALYZER
 # ═══════════════════════════════════════════════════════════════════
 
+@functools.lru_cache(maxsize=256)
+def _get_ticker(symbol: str) -> yf.Ticker:
+    """One yf.Ticker per symbol for the life of the process."""
+    return yf.Ticker(symbol)
+
 class StockAnalyzer:
     """Main stock analysis class."""
     
     def __init__(self, config: Config):
         self.config = config
         self.notifier = EmailNotifier(config)
+        self._bundle = None
+        self._bundle_start = None
+        # symbol -> (fetched_at, history) for frames fetched this process
+        self._frames = {}
+    
+    # --- On-disk history cache -------------------------------------------
+    
+    def _cache_path(self, symbol: str) -> str:
+        """Parquet file holding this symbol's cached daily history."""
+        key = f"{symbol}|{self.config.DATA_START_DATE}|1d"
+        digest = hashlib.md5(key.encode()).hexdigest()[:12]
+        return os.path.join(self.config.CACHE_DIR, f"{symbol}_{digest}.parquet")
+    
+    def _load_cached(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Cached history for a symbol, or None if there isn't any usable."""
+        path = self._cache_path(symbol)
+        if not self.config.ENABLE_CACHE or not os.path.exists(path):
+            return None
+        try:
+            # Caches written before NaN closes were dropped may still hold some
+            return self._clean_rows(pd.read_parquet(path))
+        except Exception as e:
+            # pyarrow missing or a corrupt file - just download the full history
+            log.warning(f"⚠️  Could not read cache for {symbol}: {e}")
+            return None
+    
+    def _save_cached(self, symbol: str, df: pd.DataFrame):
+        """Write a symbol's history back to the cache."""
+        if not self.config.ENABLE_CACHE:
+            return
+        try:
+            os.makedirs(self.config.CACHE_DIR, exist_ok=True)
+            df.to_parquet(self._cache_path(symbol), compression='zstd')
+        except Exception as e:
+            log.warning(f"⚠️  Could not write cache for {symbol}: {e}")
+    
+    def _next_start(self, cached: Optional[pd.DataFrame]) -> datetime.date:
+        """First date not covered by the cached history."""
+        if cached is None or cached.empty:
+            return datetime.date.fromisoformat(self.config.DATA_START_DATE)
+        return cached.index.max().date() + datetime.timedelta(days=1)
+    
+    def _fetch_start(self, cached: Optional[pd.DataFrame]) -> datetime.date:
+        """Where a refresh starts: a few days before the cache ends, so the overlap can be checked."""
+        first = datetime.date.fromisoformat(self.config.DATA_START_DATE)
+        if cached is None or cached.empty:
+            return first
+        overlap = datetime.timedelta(days=self.config.CACHE_OVERLAP_DAYS)
+        return max(first, self._next_start(cached) - overlap)
+    
+    @staticmethod
+    def _clean_rows(rows: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """OHLCV columns with a tz-naive index and no NaN closes, or None if there are no rows."""
+        if rows is None or rows.empty:
+            return None
+        rows = rows[[col for col in OHLCV_COLUMNS if col in rows.columns]]
+        # One NaN close would stick in the recursive RSI/MACD state for every later bar
+        rows = rows.dropna(subset=['Close'])
+        if rows.empty:
+            return None
+        if rows.index.tz is not None:
+            # Ticker.history is tz-aware but yf.download isn't; store naive dates
+            rows.index = rows.index.tz_localize(None)
+        return rows
+    
+    @staticmethod
+    def _overlap_matches(cached: pd.DataFrame, new_rows: pd.DataFrame) -> bool:
+        """Whether re-downloaded bars agree with the cached ones on the days both cover.
         
-    def fetch_data(self, symbol: str) -> Optional[pd.DataFrame]:
-        """Fetch stock data from Yahoo Finance."""
+        Prices are split/dividend adjusted, so a corporate action rewrites every
+        earlier bar and the cached history no longer lines up with new rows.
+        """
+        common = cached.index.intersection(new_rows.index)
+        if common.empty:
+            return True
+        return np.allclose(cached.loc[common, 'Close'].to_numpy(dtype=np.float64),
+                           new_rows.loc[common, 'Close'].to_numpy(dtype=np.float64),
+                           rtol=1e-6, equal_nan=True)
+    
+    def _is_fresh(self, symbol: str) -> bool:
+        """Whether this symbol was fetched within the last check interval."""
+        if symbol not in self._frames:
+            return False
+        fetched_at, _ = self._frames[symbol]
+        return time.time() - fetched_at < self.config.CHECK_INTERVAL_HOURS * 3600
+    
+    # --- Fetching ----------------------------------------------------------
+    
+    def download_all(self, symbols: List[str]):
+        """Download every symbol's missing history in one batched, concurrent request."""
+        self._bundle = None
+        today = datetime.date.today()
+        starts = []
+        for symbol in symbols:
+            if self._is_fresh(symbol):
+                continue
+            cached = self._load_cached(symbol)
+            if self._next_start(cached) < today:
+                starts.append(self._fetch_start(cached))
+        if not starts:
+            return
+        # One request covers every symbol's gap, so start from the oldest one
+        self._bundle_start = min(starts)
         try:
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(start=self.config.DATA_START_DATE, end=datetime.date.today())
-            
-            if df.empty:
-                log.warning(f"⚠️  No data for {symbol}")
+            self._bundle = yf.download(
+                tickers=' '.join(symbols),
+                start=self._bundle_start,
+                end=today,
+                group_by='ticker',
+                threads=True,
+                auto_adjust=True,
+                progress=False
+            )
+        except Exception as e:
+            log.error(f"❌ Batch download failed, fetching symbols one by one: {e}")
+            self._bundle = None
+    
+    def _from_bundle(self, symbol: str, start: datetime.date) -> Optional[pd.DataFrame]:
+        """This symbol's rows since start from the batched download (None if not in it)."""
+        bundle = self._bundle
+        if bundle is None or start < self._bundle_start:
+            return None
+        if bundle.empty:
+            return bundle
+        if isinstance(bundle.columns, pd.MultiIndex):
+            if symbol not in bundle.columns.get_level_values(0):
                 return None
-            
-            return df
-            
+            df = bundle[symbol]
+        else:
+            # Older yfinance returns flat columns for a single ticker
+            df = bundle
+        # Symbols trade on different calendars, so the bundle pads with NaN rows
+        df = df.dropna()
+        return df[df.index.date >= start]
+    
+    def _fetch_history(self, symbol: str, start: datetime.date) -> Optional[pd.DataFrame]:
+        """Fetch one symbol's history since start on its own."""
+        try:
+            ticker = _get_ticker(symbol)
+            return ticker.history(start=start, end=datetime.date.today())
         except Exception as e:
             log.error(f"❌ Error fetching {symbol}: {e}")
             return None
+        
+    def fetch_data(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Fetch stock data from Yahoo Finance, downloading only what the cache lacks."""
+        if self._is_fresh(symbol):
+            return self._frames[symbol][1]
+        
+        cached = self._load_cached(symbol)
+        new_rows = None
+        if self._next_start(cached) < datetime.date.today():
+            start = self._fetch_start(cached)
+            new_rows = self._from_bundle(symbol, start)
+            if new_rows is None:
+                new_rows = self._fetch_history(symbol, start)
+        new_rows = self._clean_rows(new_rows)
+        
+        if new_rows is not None and cached is not None and not self._overlap_matches(cached, new_rows):
+            # A split or dividend re-adjusted the history; appending would leave a fake gap
+            log.info(f"🔄 {symbol}: adjusted prices changed, rebuilding cached history")
+            cached = None
+            new_rows = self._clean_rows(self._fetch_history(symbol, self._fetch_start(None)))
+        
+        has_new_rows = new_rows is not None
+        if has_new_rows:
+            df = new_rows if cached is None else pd.concat([cached, new_rows])
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+        else:
+            df = cached
+        
+        if df is None or df.empty:
+            log.warning(f"⚠️  No data for {symbol}")
+            return None
+        
+        if has_new_rows:
+            self._save_cached(symbol, df)
+        self._frames[symbol] = (time.time(), df)
+        return df
     
     def analyze_symbol(self, symbol: str) -> Optional[Dict]:
         """Analyze a single symbol."""
@@ -668,6 +1238,10 @@ class StockAnalyzer:
         if df is None:
             return None
         
+        # float32 is plenty for the signals and halves the data the kernels
+        # stream through; they still accumulate in float64
+        df = df.astype({col: np.float32 for col in OHLCV_COLUMNS if col in df.columns})
+        
         # Generate signals
         signal_gen = SignalGenerator(df, self.config)
         analysis = signal_gen.analyze()
@@ -695,9 +1269,15 @@ class StockAnalyzer:
         log.info(f"🚀 Starting analysis of {len(symbols)} symbols")
         log.info(f"{'='*70}\n")
         
-        for symbol in tqdm(symbols, desc="Analyzing"):
-            results[symbol] = self.analyze_symbol(symbol)
-            time.sleep(1)  # Rate limiting
+        # One batched download, then CPU analysis in parallel: the indicator
+        # kernels are compiled with nogil=True, so the threads overlap there
+        self.download_all(symbols)
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(symbols)))) as executor:
+            analyses = executor.map(self.analyze_symbol, symbols)
+            # No progress bar when running headless (e.g. on schedule with output to a file)
+            progress = tqdm(analyses, total=len(symbols), desc="Analyzing", disable=not sys.stderr.isatty())
+            for symbol, analysis in zip(symbols, progress):
+                results[symbol] = analysis
         
         # Summary
         self._print_summary(results)
@@ -730,6 +1310,20 @@ class StockAnalyzer:
 # MAIN EXECUTION
 # ═══════════════════════════════════════════════════════════════════
 
+def _market_open_now() -> bool:
+    """Whether the NYSE session is open right now."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    if HAS_MARKET_CALENDARS:
+        try:
+            sessions = mcal.get_calendar('NYSE').schedule(start_date=now.date(), end_date=now.date())
+            if sessions.empty:
+                return False  # Weekend or holiday
+            return sessions['market_open'].iloc[0] <= now <= sessions['market_close'].iloc[0]
+        except Exception as e:
+            log.warning(f"⚠️  Market calendar lookup failed, using weekday/hour check: {e}")
+    # Weekdays, 09:30-16:00 ET is roughly 14:00-21:00 UTC across DST
+    return now.weekday() < 5 and 14 <= now.hour <= 21
+
 def main():
     """Main execution function."""
     parser = argparse.ArgumentParser(
@@ -803,12 +1397,31 @@ def main():
     analyzer = StockAnalyzer(config)
     
     # Run analysis
-    def run_analysis():
+    last_run_date = None
+    # yfinance and the email clients are blocking, so they run on this pool
+    # while the event loop only sleeps between runs
+    io_pool = ThreadPoolExecutor(max_workers=2)
+    
+    async def run_analysis():
+        nonlocal last_run_date
+        today = datetime.date.today()
+        # Outside market hours no new bars arrive, so one run per day is enough
+        if last_run_date == today and not _market_open_now():
+            log.info("💤 Market closed and today's analysis already ran - skipping")
+            return
+        last_run_date = today
+        
         log.info(f"\n🕐 Analysis started at {datetime.datetime.now()}")
-        results =  analyzer.analyze_all(symbols)
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(io_pool, analyzer.analyze_all, symbols)
         html_content, text_summary = generate_report_content(results)
         receiver_email = config.RECEIVER_EMAIL
-        send_email_to_inform( symbol="listAllSymbols", action="Summary", text=html_content, receiver=receiver_email)
+        # The summary email goes out while the HTML page is written
+        email_sent = loop.run_in_executor(
+            io_pool,
+            functools.partial(send_email_to_inform, symbol="listAllSymbols", action="Summary",
+                              text=html_content, receiver=receiver_email)
+        )
             
         if config.ENABLE_HTML_OUTPUT:
             filename = "output_page.html"
@@ -819,24 +1432,26 @@ def main():
 
             print(f"HTML content saved successfully to {filename}")
 
-        breakpoint()
+        await email_sent
         log.info(f"✅ Analysis complete\n")
     
-    if args.schedule:
-        # Run on schedule
-        log.info(f"⏰ Scheduling analysis every {config.CHECK_INTERVAL_HOURS} hour(s)")
-        schedule.every(config.CHECK_INTERVAL_HOURS).hours.do(run_analysis)
-        
-        # Run once immediately
-        run_analysis()
-        
-        # Keep running
+    async def run_scheduled():
+        # Run once immediately, then sleep until the next run is due
         while True:
-            schedule.run_pending()
-            time.sleep(60)
-    else:
-        # Run once
-        run_analysis()
+            await run_analysis()
+            await asyncio.sleep(config.CHECK_INTERVAL_HOURS * 3600)
+    
+    try:
+        if args.schedule:
+            # Run on schedule
+            log.info(f"⏰ Scheduling analysis every {config.CHECK_INTERVAL_HOURS} hour(s)")
+            asyncio.run(run_scheduled())
+        else:
+            # Run once
+            asyncio.run(run_analysis())
+    finally:
+        io_pool.shutdown()
+        analyzer.notifier.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,14 +1,18 @@
 import schedule
 import numpy as np
 import pandas as pd
-import pandas_datareader as pdr
-import matplotlib.pyplot as plt
+from numpy.lib.stride_tricks import sliding_window_view
 import datetime
+import math
 import time
+import threading
 import os
 import sys
 import argparse
+from collections import namedtuple
+from pathlib import Path
 import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor, wait
 
 import email
 import smtplib
@@ -18,6 +22,25 @@ import os
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 
+# numba is optional: without it the bands kernel runs as plain Python
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# TA-Lib is optional too: when present its C BBANDS replaces our kernels
+try:
+    import talib
+    HAS_TALIB = True
+except ImportError:
+    HAS_TALIB = False
+
 
 parser = argparse.ArgumentParser(description='This is my example: python3 ./inform_prices_and_bollinger_stats.py ')
 args = parser.parse_args()
@@ -57,13 +80,36 @@ def sent_email_to_inform_hotmail_DEPRICATED(symbol, action, text):
     s.quit()
 
 
+# Network and disk work (cache reads and writes, the Yahoo download, emails)
+# and the band math get separate pools so neither waits behind the other.
+# Only the numba kernel (windows above VECTORIZED_MAX_WINDOW) fully releases
+# the GIL; the NumPy paths mostly hold it, so for them the CPU pool keeps
+# analysis off the I/O threads rather than running it on every core.
+# job() waits for queued emails at the end
+io_pool = ThreadPoolExecutor(max_workers=16)
+cpu_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+_pending = []
+_sg_client = None
+
+def _get_sg():
+    # One client for every email, so its HTTP connection is reused
+    global _sg_client
+    if _sg_client is None:
+        _sg_client = SendGridAPIClient(os.environ.get('SENDGRID_API_KEY'))
+    return _sg_client
+
+def _do_send(sg, message):
+    response = sg.send(message)
+    print(response.status_code)
+    print(response.body)
+    print(response.headers)
+    return response.status_code
+
 def sent_email_to_inform(symbol, action, text):
     # Check if the required environment variables are set
     if not os.environ.get('SENDER_EMAIL') or not os.environ.get('RECEIVER_EMAIL') or not os.environ.get('SENDGRID_API_KEY'):
-        # Replaced print with log.info for consistency with original code
-        log.info(
-            "Error: SENDER_EMAIL or SENDGRID_API_KEY environment variables not set.")
-        log.info("Please set these variables and tgit ary again.")
+        print("Error: SENDER_EMAIL or SENDGRID_API_KEY environment variables not set.")
+        print("Please set these variables and try again.")
         return 0    
     
     
@@ -72,43 +118,262 @@ def sent_email_to_inform(symbol, action, text):
         to_emails=os.environ.get('RECEIVER_EMAIL'),
         subject=f"STOCKS from me: {symbol} {action}",
         html_content=text)
-    try:
-        sg = SendGridAPIClient(os.environ.get('SENDGRID_API_KEY'))
-        # sg.set_sendgrid_data_residency("eu")
-        # uncomment the above line if you are sending mail using a regional EU subuser
-        response = sg.send(message)
-        print(response.status_code)
-        print(response.body)
-        print(response.headers)
-    except Exception as e:
-        print(e.message)
+    # sg.set_sendgrid_data_residency("eu")
+    # uncomment the above line if you are sending mail using a regional EU subuser
+    _pending.append(io_pool.submit(_do_send, _get_sg(), message))
+    return 1
+
+def wait_for_emails():
+    # Block until every queued email is sent, reporting the ones that failed
+    done, _ = wait(_pending)
+    for future in done:
+        if future.exception() is not None:
+            print("Email failed: " + str(future.exception()))
+    _pending.clear()
     
     
 
+# cache=True keeps the compiled kernel on disk, so only the first run pays the JIT
+@njit(cache=True, fastmath=True, nogil=True)
+def _bbands_numba(prices, rate):
+    # One pass with a running sum and sum of squares: SMA and both bands together
+    n = prices.size
+    sma = np.empty(n)
+    up = np.empty(n)
+    down = np.empty(n)
+    s = 0.0
+    s2 = 0.0
+    for i in range(n):
+        x = prices[i]
+        s += x
+        s2 += x * x
+        if i >= rate:
+            old = prices[i - rate]
+            s -= old
+            s2 -= old * old
+        if i < rate - 1:
+            sma[i] = np.nan
+            up[i] = np.nan
+            down[i] = np.nan
+            continue
+        mean = s / rate
+        var = (s2 - s * s / rate) / (rate - 1)  # sample variance (ddof=1), like pandas .std()
+        std = np.sqrt(var) if var > 0.0 else 0.0
+        sma[i] = mean
+        up[i] = mean + 2 * std # Calculate top band
+        down[i] = mean - 2 * std # Calculate bottom band
+    return sma, up, down
+
+# Windows up to this size use the vectorized NumPy bands; longer ones the
+# running-sum kernel, where O(n * rate) work would start to dominate
+VECTORIZED_MAX_WINDOW = 64
+
+def bbands_vectorized(prices, rate):
+    # Every window as a zero-copy (n - rate + 1, rate) view, reduced along axis 1
+    n = prices.size
+    # Both bands live in one buffer and are computed in place
+    bands = np.full((2, n), np.nan)
+    if n < rate:
+        return bands[0], bands[1]
+    windows = sliding_window_view(prices, rate)
+    # Accumulate in float64 even for float32 prices
+    mean = windows.mean(axis=1, dtype=np.float64)
+    std = windows.std(axis=1, dtype=np.float64, ddof=1)
+    up = bands[0, rate - 1:]
+    down = bands[1, rate - 1:]
+    np.multiply(std, 2.0, out=up)
+    np.add(mean, up, out=up)
+    np.multiply(std, -2.0, out=down)
+    np.add(mean, down, out=down)
+    return bands[0], bands[1]
+
+def bollinger_bands(prices, rate):
+    # (up, down) band arrays for a float32/float64 price array. Every path
+    # uses the sample std (ddof=1), matching pandas' default .std()
+    if HAS_TALIB:
+        # TA-Lib only takes float64; matype=0 is the simple moving average.
+        # BBANDS always uses the population std, so scale the deviations to ddof=1
+        nbdev = 2.0 * math.sqrt(rate / (rate - 1))
+        up, _, down = talib.BBANDS(prices.astype(np.float64, copy=False), timeperiod=rate,
+                                   nbdevup=nbdev, nbdevdn=nbdev, matype=0)
+        return up, down
+    if rate <= VECTORIZED_MAX_WINDOW:
+        return bbands_vectorized(prices, rate)
+    _, up, down = _bbands_numba(prices, rate)
+    return up, down
+
+def _as_float_array(prices, dtype=np.float64):
+    # yf.download may hand back a one-column frame instead of a Series
+    return np.ascontiguousarray(prices, dtype=dtype).ravel()
+
 def get_sma(prices, rate):
-    return prices.rolling(rate).mean()
+    sma, _, _ = _bbands_numba(_as_float_array(prices), rate)
+    return pd.Series(sma, index=prices.index)
 
 def get_bollinger_bands(prices, rate=10):
-    sma = get_sma(prices, rate)
-    std = prices.rolling(rate).std()
-    bollinger_up = sma + std * 2 # Calculate top band
-    bollinger_down = sma - std * 2 # Calculate bottom band
-    return bollinger_up, bollinger_down
-
-def find_stock_to_buy_or_sell(symbol,roling_window):
-    end = datetime.date.today()
+    bollinger_up, bollinger_down = bollinger_bands(_as_float_array(prices), rate)
+    return pd.Series(bollinger_up, index=prices.index), pd.Series(bollinger_down, index=prices.index)
+
+# Bollinger windows checked per symbol: (long, short)
+STOCK_WINDOWS = (50, 5)
+CURRENCY_WINDOWS = (70, 15)
+
+# Daily bars are cached per ticker and only the missing tail is downloaded
+_cache_dir = Path("./.bar_cache")
+HISTORY_START = '2023-01-01'
+# Days re-downloaded before the cache end, to spot prices re-adjusted by a split or dividend
+OVERLAP_DAYS = 7
+
+def load_cached_bars(symbol):
+    path = _cache_dir / f"{symbol}.parquet"
+    if not path.exists():
+        return None
+    try:
+        return pd.read_parquet(path, engine='pyarrow')
+    except Exception as e:
+        print("Could not read cached bars for " + symbol + ": " + str(e))
+        return None
+
+def save_cached_bars(symbol, df):
+    try:
+        _cache_dir.mkdir(exist_ok=True)
+        df.to_parquet(_cache_dir / f"{symbol}.parquet", engine='pyarrow', compression='zstd')
+    except Exception as e:
+        print("Could not cache bars for " + symbol + ": " + str(e))
+
+def next_start(cached):
+    # First day the cache doesn't cover
+    if cached is None or cached.empty:
+        return pd.Timestamp(HISTORY_START)
+    return cached.index.max() + pd.Timedelta(days=1)
+
+def fetch_start(cached):
+    # Where the download starts: a few days into the cache, so the overlap can be checked
+    if cached is None or cached.empty:
+        return pd.Timestamp(HISTORY_START)
+    return max(pd.Timestamp(HISTORY_START), next_start(cached) - pd.Timedelta(days=OVERLAP_DAYS))
+
+def overlap_matches(cached, new):
+    # Prices are adjusted, so a split or dividend rewrites every earlier close
+    common = cached.index.intersection(new.index)
+    if common.empty:
+        return True
+    return np.allclose(cached.loc[common, 'Close'].to_numpy(dtype=np.float64),
+                       new.loc[common, 'Close'].to_numpy(dtype=np.float64),
+                       rtol=1e-6, equal_nan=True)
+
+def update_bars(symbol, cached, data):
+    # Cached bars plus whatever the download added after them
+    new = ticker_frame(data, symbol) if data is not None else None
+    if new is not None and cached is not None and not overlap_matches(cached, new):
+        # Appending to the old adjusted bars would leave a fake gap; start over
+        print("Adjusted prices changed for " + symbol + ", rebuilding cached bars")
+        cached = None
+        full = download_all([symbol], HISTORY_START, end_date=datetime.date.today())
+        new = ticker_frame(full, symbol) if full is not None else None
+    if new is not None:
+        new = new[new.index >= next_start(cached)]
+    if new is None or new.empty:
+        return cached
+    df = new if cached is None else pd.concat([cached, new])
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    save_cached_bars(symbol, df)
+    return df
+
+class TokenBucket:
+    # Allows bursts of up to `capacity` calls, refilled at `rate` calls/second
+    def __init__(self, rate=5.0, capacity=10):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        # io_pool threads share one bucket
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # Wait only as long as needed for one token; sleep outside the lock
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+# Throttles Yahoo requests instead of a fixed sleep per symbol
+_yahoo_bucket = TokenBucket(rate=5.0, capacity=10)
+
+# One pooled HTTP session for every Yahoo request. Recent yfinance only
+# accepts curl_cffi sessions; older versions take a plain requests one
+try:
+    from curl_cffi import requests as curl_requests
+    _yahoo_session = curl_requests.Session(impersonate="chrome")
+except ImportError:
+    import requests
+    from requests.adapters import HTTPAdapter
+    _yahoo_session = requests.Session()
+    _yahoo_session.mount('https://', HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=3))
+
+def download_all(symbols, start, end_date, retries=3):
+    # One grouped request for every ticker (yfinance fetches them on threads),
+    # retried with exponential backoff
     #  BUG: there is a problem here. https://stackoverflow.com/questions/74832296/typeerror-string-indices-must-be-integers-when-getting-data-of-a-stock-from-y
     # df = pdr.DataReader(symbol, 'yahoo', '2021-01-01', datetime.date.today())
-    df = yf.download(symbol, start='2023-01-01', end=datetime.date.today())
-
-    df.index = np.arange(df.shape[0])
-    closing_prices = df['Close']
+    for attempt in range(retries):
+        try:
+            _yahoo_bucket.acquire()
+            data = yf.download(symbols, start=start, end=end_date,
+                               group_by='ticker', threads=True, progress=False,
+                               session=_yahoo_session)
+            if not data.empty:
+                return data
+            print("download returned no data")
+        except Exception as e:
+            print("download failed: " + str(e))
+        if attempt < retries - 1:
+            time.sleep(2 ** attempt)
+    return None
+
+def ticker_frame(data, symbol):
+    # This ticker's rows from the grouped download (None if it isn't there)
+    if isinstance(data.columns, pd.MultiIndex):
+        if symbol not in data.columns.get_level_values(0):
+            return None
+        data = data[symbol]
+    # Tickers trade on different calendars, so the grouped frame has NaN rows
+    df = data.dropna()
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    return df if not df.empty else None
+
+# Last-bar prices and bands for one (symbol, window) check
+LastBar = namedtuple('LastBar', ['symbol', 'window', 'close', 'bollinger_down', 'bollinger_up', 'low', 'high'])
+
+def analyze_symbol(symbol, df, windows=STOCK_WINDOWS):
+    # Check every window against the same prices
+    # float32 holds daily prices with room to spare and halves the bytes the
+    # band reductions stream; the kernels still accumulate in float64
+    closing_prices = _as_float_array(df['Close'], np.float32)
+    low = _as_float_array(df['Low'], np.float32)
+    high = _as_float_array(df['High'], np.float32)
+    bars = []
+    for roling_window in windows:
+        print("Checking: window " + str(roling_window) + ": " + symbol)
+        bars.append(last_bar_bands(symbol, roling_window, closing_prices, low, high))
+    return bars
+
+def last_bar_bands(symbol, roling_window, closing_prices, low, high):
     print("")
     print("get bands")
-    bollinger_up, bollinger_down = get_bollinger_bands(closing_prices, roling_window)
+    bollinger_up, bollinger_down = bollinger_bands(closing_prices, roling_window)
 
     makeGraph="bo"
     if (makeGraph=="yes"):
+        # Imported here so runs without graphs don't pay for matplotlib
+        import matplotlib.pyplot as plt
         plt.title(symbol + ' Bollinger Bands')
         plt.xlabel('Days')
         plt.ylabel('Closing Prices')
@@ -118,53 +383,52 @@ def find_stock_to_buy_or_sell(symbol,roling_window):
         plt.legend()
         plt.show()
 
-    # shouldn't change this
-    N = 1
-    low = df["Low"]
-    high = df["High"]
-
-    toPrint = "WhatToDo"
-    status = "NA"
-    percentage_fall = 0
-    percentage_up   = 0
-
-
-
-    for x, y, h, z, m in zip(
-        [closing_prices[-N:].values.item()], 
-        [bollinger_down[-N:].values.item()], 
-        [bollinger_up[-N:].values.item()], 
-        [low[-N:].values.item()], 
-        [high[-N:].values.item()]
-    ):        
-
-        info = (
-            f"closing_price: {round(x,2)} "
-            f"bollinger_down: {round(y,2)} "
-            f"bollinger_up: {round(h,2)} "
-            f"low: {round(z,2)} "
-            f"high: {round(m,2)}"
-        )
-
-        print(info)
-        if (x<y):
-            # os.system("printf '\a'") # or '\7'
-            toPrint="!!BUY!!! "+info
-            status="BUY"
-            sent_email_to_inform(symbol, status, toPrint)
-            # print("BUY!")
-        elif (x>h):
-            # os.system("printf '\7'") # or '\7'
-            toPrint="!!SELL!! "+info
-            status="SELL"
-            sent_email_to_inform(symbol, status, toPrint)
-            # print("SELL!")
-        else:
-            toPrint="HOLD "+info
-            status="HOLD"
-            # print("HOLD")
-    print("Symbol:" + symbol + " to " +toPrint)
-    return 'good'
+    # Last bar only
+    return LastBar(symbol, roling_window, float(closing_prices[-1]), float(bollinger_down[-1]),
+                   float(bollinger_up[-1]), float(low[-1]), float(high[-1]))
+
+def bar_info(bar):
+    return (
+        f"closing_price: {bar.close:.2f} "
+        f"bollinger_down: {bar.bollinger_down:.2f} "
+        f"bollinger_up: {bar.bollinger_up:.2f} "
+        f"low: {bar.low:.2f} "
+        f"high: {bar.high:.2f}"
+    )
+
+def find_stock_to_buy_or_sell(bars):
+    # Classify every check at once: below the lower band is BUY, above the upper SELL.
+    # Returns the BUY/SELL signals so job() can mail them in one digest
+    signals = []
+    if not bars:
+        return signals
+    last_close = np.array([bar.close for bar in bars])
+    bb_down_last = np.array([bar.bollinger_down for bar in bars])
+    bb_up_last = np.array([bar.bollinger_up for bar in bars])
+    buy_mask = last_close < bb_down_last
+    sell_mask = last_close > bb_up_last
+
+    parts = []
+    for i in np.flatnonzero(buy_mask):
+        toPrint = f"!!BUY!!! {bar_info(bars[i])}"
+        signals.append({'symbol': bars[i].symbol, 'status': "BUY", 'info': bar_info(bars[i])})
+        parts.append(f"Symbol:{bars[i].symbol} to {toPrint}")
+    for i in np.flatnonzero(sell_mask):
+        toPrint = f"!!SELL!! {bar_info(bars[i])}"
+        signals.append({'symbol': bars[i].symbol, 'status': "SELL", 'info': bar_info(bars[i])})
+        parts.append(f"Symbol:{bars[i].symbol} to {toPrint}")
+    for i in np.flatnonzero(~(buy_mask | sell_mask)):
+        parts.append(f"Symbol:{bars[i].symbol} to HOLD {bar_info(bars[i])}")
+    print("\n".join(parts))
+    return signals
+
+def digest_html(signals):
+    # One table row per signal for the end-of-job email
+    rows = "".join(
+        f"<tr><td>{s['symbol']}</td><td>{s['status']}</td><td>{s['info']}</td></tr>"
+        for s in signals
+    )
+    return f"<table><tr><th>Symbol</th><th>Action</th><th>Info</th></tr>{rows}</table>"
 
 
 #create the alarm clock.
@@ -177,23 +441,45 @@ def print_now_time():
 def job(number_loops=1):
     # sleep for some time....
     print("################")
+    today = datetime.date.today()
 
     for lp in range(number_loops):
         print(number_loops)
         print_now_time()
 
-        for stock in mystocks_to_check:
-            time.sleep(10)
-            print("Checking: long: "+stock)
-            find_stock_to_buy_or_sell(stock, 50)
-            print("Checking: short: "+stock)
-            find_stock_to_buy_or_sell(stock, 5)
-        # time.sleep(12800)
-        for currency in myCurrencies:
-            print("Checking: long: "+currency)
-            find_stock_to_buy_or_sell(currency, 70)
-            print("Checking: short: "+currency)
-            find_stock_to_buy_or_sell(currency, 15)
+        checks = [(stock, STOCK_WINDOWS) for stock in mystocks_to_check] + \
+                 [(currency, CURRENCY_WINDOWS) for currency in myCurrencies]
+        symbols = [symbol for symbol, _ in checks]
+        cached = dict(zip(symbols, io_pool.map(load_cached_bars, symbols)))
+
+        # One download from the oldest gap covers every ticker's missing tail
+        # (plus a few overlapping days to check the cached bars against)
+        stale = [bars for bars in cached.values() if next_start(bars).date() < today]
+        data = None
+        if stale:
+            start = min(fetch_start(bars) for bars in stale)
+            data = io_pool.submit(download_all, symbols, start, end_date=today).result()
+            if data is None:
+                print("Could not download prices, using cached bars only")
+
+        # Merging into the cache (and the Parquet write, or a rebuild download)
+        # happens on io_pool; each symbol's checks go to cpu_pool once its bars
+        # are ready. Results are gathered in check order
+        merged = [io_pool.submit(update_bars, symbol, cached[symbol], data) for symbol in symbols]
+        futures = []
+        for (symbol, windows), merged_bars in zip(checks, merged):
+            df = merged_bars.result()
+            if df is None:
+                print("No data for: " + symbol)
+                continue
+            futures.append(cpu_pool.submit(analyze_symbol, symbol, df, windows))
+        bars = [bar for future in futures for bar in future.result()]
+        signals = []
+        signals.extend(find_stock_to_buy_or_sell(bars))
+        # Every BUY/SELL of this run goes out as a single email
+        if signals:
+            sent_email_to_inform('digest', 'SUMMARY', digest_html(signals))
+        wait_for_emails()
         # time.sleep(12800)
         # for i in range(1000,0,-1):
         #     sys.stdout.write(str(i)+' ')
@@ -208,6 +494,7 @@ debug_email = 0  # 1 or 0
 if debug_email == 1 :
     print('test email')
     sent_email_to_inform('TEST', 'TESTREADY', 'ALL GOOD!! COMMENT')
+    wait_for_emails()
     exit()
 
 job()